@@ -8,9 +8,10 @@ from application.config import (
     METRICS_FOR_MARKET_SHARE
 )
 from infrastructure.repositories import InsuranceRepository
+from infrastructure.startup import startup
 from infrastructure.logger import (
     setup_logging, logger, dash_callback,
-    configure_callback_logger, pipe_with_logging
+    configure_callback_logger, configure_memory_accounting, pipe_with_logging
 )
 from domain import METRICS_MAPPING, MetricsFormulas
 from application.core.service_factory import ServiceFactory
@@ -58,6 +59,11 @@ def initialize_application():
         log_file='app.log'
     )
     configure_callback_logger()
+    configure_memory_accounting(
+        sample_every=AppConfig.MEMORY_SAMPLE_EVERY,
+        trace_peak=AppConfig.MEMORY_TRACE_PEAK
+    )
+    startup.mark('logging_setup')
 
     # Create consolidated configuration
     config = AppConfiguration(
@@ -85,9 +91,11 @@ def initialize_application():
     # Load data
     repo = InsuranceRepository(config)
     df_158, df_162 = repo.load_dataframes()
+    startup.mark('load_data')
 
     # Create service factory and initialize all services
     factory = ServiceFactory(config)
     service_bundle = factory.create_all_services(df_158, df_162)
+    startup.mark('services')
 
     return service_bundle, config
\ No newline at end of file
@@ -1,8 +1,11 @@
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import time
 from dash import dash_table
+import numpy as np
 import pandas as pd
-import itertools
 from application.processors.helpers import filter_by_column
+from infrastructure.profiling import profiler
 
 class ProcessOrchestrator:
     """Orchestrates data processing and visualization pipeline.
@@ -28,6 +31,13 @@ class ProcessOrchestrator:
         self.selection_facade = selection_facade
         self.context = context
 
+        self._max_workers = config.app_config.VISUALIZATION_WORKERS
+        self._prune_hidden = config.app_config.PRUNE_HIDDEN_COLUMNS
+        self._client_views = config.app_config.CLIENT_VIEW_SWITCHING
+        self._max_sections = config.app_config.MAX_VISUALIZATION_SECTIONS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.section_timings: List[Dict[str, float]] = []
+
     def process_dashboard_data(self):
         """Process dashboard data through pipeline."""
 
@@ -48,11 +58,11 @@ class ProcessOrchestrator:
                   self.context.columns.YEAR_QUARTER, self.context.end_q, 'lte')
             .pipe(lambda df: self.context.update_state(filtered_quarters_df=df))
             .pipe(self.log_pipe, self.data_processing.add_rank_column,
-                  self.context.value_types, self.context.num_periods)
+                  self._get_value_types(), self.context.num_periods)
             .pipe(self.log_pipe, self.data_processing.calculate_market_share,
-                  self.context.value_types)
+                  self._get_value_types())
             .pipe(self.log_pipe, self.data_processing.calculate_growth,
-                  self.context.value_types, self.context.num_periods)
+                  self._get_value_types(), self.context.num_periods)
             .pipe(self.log_pipe, self.data_processing.format_ranks)
         )
         self.context.update_state(processed_df=processed_df)
@@ -65,38 +75,149 @@ class ProcessOrchestrator:
             return None
         result_dfs = self.visualization.process_dimensional_data(
             self.context.processed_df, self.context.insurers, self.context.lines,
-            self.context.metrics, self.context.value_types, self.context.quarters,
-            self.context.split_cols, 10
+            self.context.metrics, self._get_value_types(), self.context.quarters,
+            self.context.split_cols, self._max_sections
         )
         self.context.update_state(result_dfs=result_dfs)
         return self.context.filtered_quarters
 
+    def _get_value_types(self) -> List[str]:
+        """Value types to compute.
+
+        With client-side view switching every value type is computed once,
+        and the browser only toggles which of them are visible.
+        """
+        if not self._client_views:
+            return self.context.value_types
+        vt = self.config.value_types
+        return [vt.BASE, vt.MARKET_SHARE, vt.RANK,
+                vt.BASE_CHANGE, vt.MARKET_SHARE_CHANGE, vt.RANK_CHANGE]
+
+    def create_client_payload(self) -> Dict[str, Any]:
+        """Settings the browser needs to toggle value types on its own.
+
+        Only these are sent: the rendered tables and charts already carry
+        the data of every value type.
+        """
+        vt, vm = self.config.value_types, self.config.view_modes
+        return {
+            'meta': {
+                'value_types': self._get_value_types(),
+                'view_metrics': {vm.MARKET_SHARE: vt.MARKET_SHARE,
+                                 vm.RANK: vt.RANK},
+                'change_mode': vm.CHANGE,
+                'change_suffix': vt.CHANGE_SUFFIX,
+                'base': vt.BASE
+            }
+        }
+
+    def get_section_count(self) -> int:
+        """Number of visualization sections for the current results."""
+        return len(self.context.result_dfs)
+
     def create_visualizations(
         self,
-        viewport_size: Optional[str]
+        viewport_size: Optional[str],
+        sections: Optional[List[int]] = None
     ) -> List[Dict[str, Any]]:
-        """Create visualizations based on parameters."""
+        """Create visualizations based on parameters.
+
+        Tables and charts of the requested sections (all by default) are
+        submitted to a bounded thread pool up front and reassembled in
+        section order, so a multi-section view takes roughly as long as its
+        slowest section. Unknown section indices are skipped.
+        """
         if not self.context.is_visualization_ready():
             self.logger.warning("No result dataframes available")
             return []
-        visualization_sections = []
+        if sections is None:
+            sections = range(len(self.context.result_dfs))
+        sections = [i for i in sections
+                    if 0 <= i < len(self.context.result_dfs)]
+        viewport_size = viewport_size or 'desktop'
+        # Client-side switching needs both views regardless of the current one
+        view_mode = (['table', 'chart'] if self._client_views
+                     else self.context.view_mode)
+        executor = self._get_executor()
+        # Pool tasks count towards the callback's profile when it is profiled
+        timed = profiler.wrap(self._timed)
+        start = time.perf_counter()
         try:
-            for i, (df, split_cols, split_vals) in enumerate(self.context.result_dfs):
+            pending = []
+            for i in sections:
+                df, split_cols, split_vals = self.context.result_dfs[i]
+                table_future = None
+                chart_futures: List[Future] = []
+                if 'table' in view_mode:
+                    table_future = executor.submit(
+                        timed, self._create_table,
+                        i, df, split_cols, split_vals)
+                if 'chart' in view_mode:
+                    chart_futures = [
+                        executor.submit(
+                            timed, self._create_chart,
+                            chart_df, combo, split_cols, split_vals,
+                            viewport_size, chart_n)
+                        for chart_n, (combo, chart_df) in enumerate(
+                            self._get_chart_groups(df))
+                    ]
+                pending.append((table_future, chart_futures))
+
+            visualization_sections = []
+            section_timings = []
+            for i, (table_future, chart_futures) in zip(sections, pending):
                 section = {'table': None, 'charts': []}
-                if 'table' in self.context.view_mode:
-                    section['table'] = self._create_table(
-                        df, split_cols, split_vals)
-                if 'chart' in self.context.view_mode:
-                    section['charts'] = self._create_charts(
-                        df, split_cols, split_vals, viewport_size or 'desktop', i)
+                table_ms = 0.0
+                if table_future is not None:
+                    section['table'], table_ms = table_future.result()
+                chart_results = [future.result() for future in chart_futures]
+                section['charts'] = [chart for chart, _ in chart_results
+                                     if chart is not None]
+                section_timings.append({
+                    'section': i,
+                    'table_ms': table_ms,
+                    'charts_ms': sum(ms for _, ms in chart_results),
+                    'charts': len(section['charts'])
+                })
                 visualization_sections.append(section)
+
+            self.section_timings = section_timings
+            self._log_section_timings(
+                section_timings, (time.perf_counter() - start) * 1000)
             return visualization_sections
         except Exception as e:
             self.logger.error(f"Visualization error: {str(e)}", exc_info=True)
             raise
 
-    def _create_table(self, df: pd.DataFrame, split_cols: List[str],
-                     split_vals: List[Any]) -> dash_table.DataTable:
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the shared pool used for section building."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix='visualization')
+        return self._executor
+
+    @staticmethod
+    def _timed(func, *args) -> Tuple[Any, float]:
+        """Run func and return its result with the elapsed time in ms."""
+        start = time.perf_counter()
+        result = func(*args)
+        return result, (time.perf_counter() - start) * 1000
+
+    def _log_section_timings(self, section_timings: List[Dict[str, float]],
+                             wall_ms: float) -> None:
+        """Log per-section build times against the overall wall time."""
+        for timing in section_timings:
+            self.logger.debug(
+                f"Section {timing['section']}: table {timing['table_ms']:.1f}ms, "
+                f"{timing['charts']} charts {timing['charts_ms']:.1f}ms")
+        self.logger.debug(
+            f"Built {len(section_timings)} sections in {wall_ms:.1f}ms "
+            f"(workers: {self._max_workers})")
+
+    def _create_table(self, section: int, df: pd.DataFrame,
+                      split_cols: List[str],
+                      split_vals: List[Any]) -> dash_table.DataTable:
         """Create data table visualization."""
         pivot = self.visualization.create_pivot(df, self.context.pivot_cols, self.context.index_cols)
         table_props = self.visualization.create_datatable(
@@ -106,44 +227,72 @@ class ProcessOrchestrator:
             self.context.period_type,
             self.context.value_types,
             split_cols=split_cols,
-            split_vals=split_vals
+            split_vals=split_vals,
+            prune_hidden=self._prune_hidden and not self._client_views
         )
+        table_props['id'] = {'type': 'dynamic-table', 'index': section}
         return dash_table.DataTable(**table_props)
 
-    def _create_charts(self, df: pd.DataFrame, split_cols: List[str],
-                       split_vals: List[Any], viewport_size: str,
-                       section_index: int) -> List[Any]:
-        """Create chart visualizations."""
+    def _get_chart_groups(
+        self,
+        df: pd.DataFrame
+    ) -> List[Tuple[Dict[str, Any], pd.DataFrame]]:
+        """Slice the frame by the columns not plotted on chart axes.
+
+        A single grouping pass yields only the combinations present in the
+        data, ordered like the product of first-appearance values, with
+        rows kept in their original order.
+        """
         other_cols = [col for col
                       in self.context.pivot_cols + self.context.index_cols
                       if col not in [self.context.index_cols[0],
                                      self.context.pivot_cols[0],
                                      self.context.columns.VALUE]]
+        if df.empty:
+            return []
+        if not other_cols:
+            return [({}, df)]
+
+        codes, uniques = zip(*(pd.factorize(df[col], sort=False)
+                               for col in other_cols))
+        shape = [max(len(u), 1) for u in uniques]
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        flat = np.full(len(df), -1, dtype=np.int64)
+        flat[valid] = np.ravel_multi_index([c[valid] for c in codes], shape)
 
-        combinations = [dict(combo) for combo in itertools.product(
-            *[[(col, val) for val in df[col].unique()] for col in other_cols]
-        )]
-
-        charts = []
-        for i, combo in enumerate(combinations):
-            chart_df = df.copy()
-            for col, val in combo.items():
-                chart_df = chart_df[chart_df[col] == val]
-
-            if not chart_df.empty:
-                chart = self.visualization.create_bar_chart(
-                    chart_df, 
-                    index_cols=self.context.index_cols,
-                    values_col=self.context.columns.VALUE,
-                    period_type=self.context.period_type,
-                    series_col=self.context.pivot_cols[0],
-                    split_cols=split_cols,
-                    split_vals=split_vals,
-                    other_cols=list(combo.keys()),
-                    other_vals=list(combo.values()),
-                    viewport_size=viewport_size,
-                    chart_n=i
-                )
-                charts.append(chart)
-
-        return charts
\ No newline at end of file
+        chart_groups = []
+        for key, positions in pd.Series(flat).groupby(
+                flat, sort=True).indices.items():
+            if key < 0:
+                continue
+            levels = np.unravel_index(key, shape)
+            combo = {col: u[level] for col, u, level
+                     in zip(other_cols, uniques, levels)}
+            chart_groups.append((combo, df.iloc[positions]))
+        return chart_groups
+
+    def _create_chart(self, chart_df: pd.DataFrame, combo: Dict[str, Any],
+                      split_cols: List[str], split_vals: List[Any],
+                      viewport_size: str, chart_n: int) -> Optional[Any]:
+        """Create chart visualization for a single pre-sliced combination."""
+        if chart_df.empty:
+            return None
+
+        chart = self.visualization.create_bar_chart(
+            chart_df,
+            index_cols=self.context.index_cols,
+            values_col=self.context.columns.VALUE,
+            period_type=self.context.period_type,
+            series_col=self.context.pivot_cols[0],
+            split_cols=split_cols,
+            split_vals=split_vals,
+            other_cols=list(combo.keys()),
+            other_vals=list(combo.values()),
+            viewport_size=viewport_size,
+            chart_n=chart_n
+        )
+        # Tag charts of a single value type so the browser can hide them
+        value_type = combo.get(self.context.columns.VALUE_TYPE)
+        if self._client_views and value_type is not None:
+            chart.className = f"{getattr(chart, 'className', '')} vt-{value_type}".strip()
+        return chart
@@ -62,7 +62,7 @@ class MetricsProcessor:
         for metric in metrics:
             add_metric_with_deps(metric)
 
-        self.logger.debug(f"required_metrics {ordered}")
+        self.logger.debug("required_metrics %s", ordered)
         return ordered
 
     def calculate_metrics(
@@ -96,7 +96,7 @@ class MetricsProcessor:
         # Pre-compute metric calculations - single dict comprehension
         metric_calcs = {m: self.metrics_formulas[m][1] for m in required_metrics}
 
-        self.logger.debug(f"metric_calcs {metric_calcs}")
+        self.logger.debug("metric_calcs %s", metric_calcs)
         all_groups = []
         grouped = df.groupby(grouping_cols)
 
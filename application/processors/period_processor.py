@@ -41,7 +41,7 @@ class PeriodProcessor:
         self.columns = self.config.columns
         self.logger = logger
 
-        self.logger.debug(f"available_quarters {available_quarters}")
+        self.logger.debug("available_quarters %s", available_quarters)
         '''self.available_quarters = self.domain_service.get_available_quarters_from_form(self.reporting_form)
         self.start_q = self.period_processor.get_start_quarter(
             self.available_quarters, self.end_q, self.period_type, self.num_periods)
@@ -58,7 +58,7 @@ class PeriodProcessor:
             return YearQuarter(f"{year}Q{quarter + 1}")
 
         if end_quarter not in available_quarters:
-            self.logger.debug(f"End quarter {end_quarter} not in available quarters")
+            self.logger.debug("End quarter %s not in available quarters", end_quarter)
             return None
 
         period_type = str(period_type).replace('-', '_')
@@ -66,11 +66,9 @@ class PeriodProcessor:
         end_q = int(end_quarter[-1])
         end_year = int(end_quarter[:4])
 
-        self.logger.debug(f"end_quarter {end_quarter}")
-        self.logger.debug(f"end_q {end_q}")
-        self.logger.debug(f"end_year {end_year}")
-        self.logger.debug(f"num_periods {num_periods}")
-        self.logger.debug(f"period_type {period_type}")
+        self.logger.debug(
+            "end_quarter %s, end_q %s, end_year %s, num_periods %s, period_type %s",
+            end_quarter, end_q, end_year, num_periods, period_type)
 
         # Dictionary of period type handlers for extensibility
         period_handlers = {
@@ -112,7 +110,7 @@ class PeriodProcessor:
         if result is None:
             result = available_quarters[0]
 
-        self.logger.debug(f"start_quarter result: {result}")
+        self.logger.debug("start_quarter result: %s", result)
         return result
 
     def calculate_period_type(
@@ -143,7 +143,7 @@ class RankProcessor:
         output = merged[join_cols].copy()
         output[self.columns.VALUE_TYPE] = self.value_types.RANK
         output[self.columns.VALUE] = merged.apply(format_rank, axis=1)
-        self.logger.debug(f"Processed {len(output)} ranking rows")
+        self.logger.debug("Processed %d ranking rows", len(output))
 
         # Combine with non-rank data
         mask_non_rank = df[self.columns.VALUE_TYPE].notna() & ~df[self.columns.VALUE_TYPE].isin(
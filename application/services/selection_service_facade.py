@@ -76,12 +76,12 @@ class SelectionServiceFacade:
         # Case 2: Top-N selection
         if selected_insurers[0].startswith('top-'):
             top_n = int(selected_insurers[0].split('-')[1])
-            self.logger.debug(f"ranked_insurers {ranked_insurers}")
+            self.logger.debug("ranked_insurers %s", ranked_insurers)
             ranked_insurers = pd.to_numeric(ranked_insurers, errors='coerce')
             output = ranked_insurers.nlargest(top_n).index.tolist()
-            self.logger.debug(f"output {output}")
+            self.logger.debug("output %s", output)
             output.extend([f"top-{top_n}"])
-            self.logger.debug(f"output {output}")
+            self.logger.debug("output %s", output)
             return output
 
         # Case 3: All available insurers - return in value order
@@ -70,16 +70,17 @@ class BarChartService:
         Returns:
             A Dash component containing the chart or error message
         """
-        self.logger.debug(f"Creating bar chart for viewport {viewport_size}")
-        self.logger.debug(f"other_vals {other_vals}")
+        self.logger.debug("Creating bar chart for viewport %s", viewport_size)
+        self.logger.debug("other_vals %s", other_vals)
 
-        # Filter and prepare data
-        base_df = df.copy()
+        # Filter and prepare data (callers usually pass pre-sliced frames)
+        base_df = df
         if other_cols and other_vals:
             mask = pd.Series(True, index=df.index)
             for col, val in zip(other_cols, other_vals):
                 mask &= df[col] == val
-            base_df = base_df[mask]
+            if not mask.all():
+                base_df = df[mask]
 
         # Check if filtered dataframe is empty
         if base_df.empty:
@@ -97,16 +98,17 @@ class BarChartService:
         x_col = index_cols[0]
 
         # Get ordered unique values while preserving DataFrame order from first occurrence
-        df_order = pd.DataFrame({'val': base_df[x_col], 'idx': range(len(base_df))})
-        first_occurrence = df_order.drop_duplicates('val').sort_values('idx')
-        x_values = first_occurrence['val'].tolist()
+        x_values = base_df[x_col].drop_duplicates().tolist()
         original_order = x_values.copy()  # Same order for both orientations
 
+        # Series are ordered by their last occurrence and split in one pass
         series_values: List[Any] = []
+        series_frames: Dict[Any, pd.DataFrame] = {}
         if series_col is not None:
-            series_values = base_df[series_col].unique().tolist()
-            series_order = {val: idx for idx, val in enumerate(base_df[series_col])}
-            series_values.sort(key=lambda x: series_order[x])
+            series_values = base_df[series_col].drop_duplicates(
+                keep='last').tolist()
+            series_frames = dict(tuple(base_df.groupby(
+                series_col, sort=False, observed=True)))
 
         # Get metric value if applicable
         metric_value: Any = None
@@ -128,7 +130,8 @@ class BarChartService:
         series_to_plot: List[Any] = [None] if series_col is None or len(series_values) == 0 else series_values
 
         for i, series_val in enumerate(series_to_plot):
-            series_df = base_df[base_df[series_col] == series_val] if series_col is not None else base_df
+            series_df = (series_frames.get(series_val, base_df.iloc[:0])
+                         if series_col is not None else base_df)
 
             # Prepare data points maintaining DataFrame order
             data = self._prepare_data_points(series_df, x_col, values_col, original_order)
@@ -241,10 +244,12 @@ class BarChartService:
     ) -> List[Tuple[Any, float]]:
         """Prepare data points for plotting, maintaining original order."""
         data: List[Tuple[Any, float]] = []
+        # Take first occurrence value per x
+        first_values = dict(df.drop_duplicates(x_col)[[x_col, values_col]]
+                            .itertuples(index=False, name=None))
         for x_val in original_order:
-            matches = df[df[x_col] == x_val]
-            if not matches.empty:
-                value = matches.iloc[0][values_col]  # Take first occurrence value
+            if x_val in first_values:
+                value = first_values[x_val]
                 if pd.isna(value) or value is None:
                     continue
                 try:
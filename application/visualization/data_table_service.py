@@ -1,8 +1,10 @@
 # application/services/data_table_service.py
+import re
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
 from dash.dash_table.Format import Format, Scheme, Group
+from infrastructure.metrics import metrics
 
 
 class DataTableService:
@@ -34,6 +36,15 @@ class DataTableService:
         'neg': GRADIENT_BASE.format(1, 219, 68, 55, 219, 68, 55)
     }
 
+    # Rows whose labels contain these keywords (aggregates) are highlighted
+    HIGHLIGHT_KEYWORDS = ('top', 'топ', 'весь рынок', 'всего')
+    HIGHLIGHT_COL = '_highlight'
+    HIGHLIGHT_STYLE = {
+        'if': {'filter_query': f'{{{HIGHLIGHT_COL}}} = 1'},
+        'backgroundColor': '#eeeff0',
+        'color': '#212529'
+    }
+
     # Base styles for cells and headers
     BASE_CELL = {
         "fontFamily": "Arial, -apple-system, system-ui, sans-serif",
@@ -91,12 +102,44 @@ class DataTableService:
         }
     }
 
-    # Class variable to store complete styles
+    # Class variables to store complete styles and per-column memos
     _complete_styles = None
+    _datatable_config = None
+    _CACHE_LIMIT = 4096
+    _column_cache: Dict[tuple, tuple] = {}
+    _header_cache: Dict[tuple, List[Dict[str, Any]]] = {}
+    _column_style_cache: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def clear_caches(cls):
+        """Drop memoized column specs and styles."""
+        cls._column_cache.clear()
+        cls._header_cache.clear()
+        cls._column_style_cache.clear()
+
+    @classmethod
+    def _recall(cls, cache: Dict[tuple, Any], name: str, key: tuple) -> Any:
+        """Look up a memoized value, counting the lookup as a hit or miss."""
+        value = cache.get(key)
+        metrics.record_cache(name, value is not None)
+        return value
+
+    @classmethod
+    def _remember(cls, cache: Dict[tuple, Any], key: tuple, value: Any) -> Any:
+        """Store a memoized value, resetting the cache once it grows too large."""
+        if len(cache) >= cls._CACHE_LIMIT:
+            cache.clear()
+        cache[key] = value
+        return value
 
     @classmethod
     def get_complete_styles(cls):
-        """Generate the complete styles by combining base styles with variations."""
+        """Generate the complete styles by combining base styles with variations.
+
+        The style tree is static, so it is built once per process.
+        """
+        if cls._complete_styles is not None:
+            return cls._complete_styles
 
         cls._complete_styles = {
             'header': {
@@ -213,8 +256,11 @@ class DataTableService:
     # Datatable base configuration
     def get_datatable_config(self):
         """Get the base datatable configuration."""
+        if DataTableService._datatable_config is not None:
+            return DataTableService._datatable_config
+
         style = self.get_complete_styles()
-        return {
+        DataTableService._datatable_config = {
             'style_cell': style['cell']['base'],
             'css': [
                 dict(zip(('selector', 'rule'),
@@ -238,24 +284,28 @@ class DataTableService:
             'style_table': {'width': 'fit-content', 'maxWidth': '100%',
                             'overflowX': 'visible', 'minWidth': 'auto'}
         }
+        return DataTableService._datatable_config
 
     def create_column_styles(self, col: str, config: Dict[str, Any]
                              ) -> List[Dict[str, Any]]:
         """Create styles for a specific column based on configuration."""
+        # Column configs live in the static style tree, so identity is a key
+        key = (col, id(config))
+        if (styles := self._recall(
+                self._column_style_cache, 'table_column_styles', key)) is not None:
+            return styles
+
         styles = []
         if config.get('base'):
-            self.logger.debug(f"config {config}")
             styles.append({"if": {"column_id": col}, **config['base']})
 
         if conditionals := config.get('conditionals'):
-            self.logger.debug(f"conditionals {conditionals}")
             styles.extend([
                 {"if": {"column_id": col,
                         "filter_query": f"{{{col}}} {cond}"}, **style}
                 for cond, style in conditionals.items()
             ])
-        self.logger.debug(f"styles {styles}")
-        return styles
+        return self._remember(self._column_style_cache, key, styles)
 
     @classmethod
     def get_header_styles(cls, col: str, col_type: str,
@@ -264,6 +314,12 @@ class DataTableService:
                           has_split: bool
                           ) -> List[Dict[str, Any]]:
         """Get the styles for table headers."""
+        key = (col, col_type, id(column_config), tuple(names),
+               tuple(pivot_cols), has_split)
+        if (styles := cls._recall(
+                cls._header_cache, 'table_headers', key)) is not None:
+            return styles
+
         style = cls.get_complete_styles()
         header_config = column_config['header']
         base_style = {k: v for k, v in style['header']['base'].items()
@@ -294,7 +350,7 @@ class DataTableService:
                     style_dict[attr] = header_config[attr](i, has_split)
 
             styles.append(style_dict)
-        return styles
+        return cls._remember(cls._header_cache, key, styles)
 
     def get_column(
         self,
@@ -307,6 +363,14 @@ class DataTableService:
         metric_vals: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Create configured datatable column with styling."""
+        key = (col, tuple(pivot_cols), tuple(index_cols), period_type,
+               tuple(split_col or ()), tuple(split_val or ()),
+               tuple(metric_vals) if isinstance(metric_vals, list)
+               else metric_vals)
+        if (column := self._recall(
+                self._column_cache, 'table_columns', key)) is not None:
+            return column
+
         style = self.get_complete_styles()
 
         has_split = bool(split_col and split_val)
@@ -321,7 +385,6 @@ class DataTableService:
             columns_format = None
         else:
             pivot_vals = col.split('&')
-            self.logger.debug(f"metric_vals {metric_vals}")
             metric_unit = None
             metric = None
             if pivot_cols and pivot_vals and 'metric' in pivot_cols:
@@ -355,7 +418,9 @@ class DataTableService:
             )
         column_config = style['column_types'][col_type][col_key]
 
-        return names, col_type, column_config, columns_format
+        return self._remember(
+            self._column_cache, key,
+            (names, col_type, column_config, columns_format))
 
     def create_datatable(
         self,
@@ -365,10 +430,35 @@ class DataTableService:
         period_type: str,
         value_types: List[str],
         split_cols: Optional[List[str]] = None,
-        split_vals: Optional[List[str]] = None
+        split_vals: Optional[List[str]] = None,
+        prune_hidden: bool = False
     ) -> Dict[str, Any]:
-        """Create configured datatable with styling."""
+        """Create configured datatable with styling.
+
+        With prune_hidden, columns of unselected value types are dropped
+        before column specs, styles and records are built instead of being
+        shipped as hidden_columns. The input frame is never modified.
+        """
         try:
+            # Handle column visibility
+            visibility_map = {
+                'market_share': 'market_share' in value_types,
+                'rank': 'rank' in value_types,
+                'change': 'base_change' in value_types,
+                'base': 'base' in value_types
+            }
+            hidden_cols = [
+                col for col in df.columns
+                if col not in index_cols
+                and any(not show for key, show in visibility_map.items()
+                        if key in col)
+            ]
+            if prune_hidden:
+                df = df.drop(columns=hidden_cols)
+                hidden_cols = []
+            else:
+                df = df.copy()
+
             columns = []
             header_styles = []
             column_styles = []
@@ -376,12 +466,9 @@ class DataTableService:
             if 'metric' in index_cols:
                 metric_vals = df['metric'].unique().tolist()
 
-            self.logger.debug(f"metric_vals {metric_vals}")
             for col in df.columns:
                 names, col_type, column_config, columns_format = self.get_column(
                     col, pivot_cols, index_cols, period_type, split_cols, split_vals, metric_vals)
-                self.logger.debug(f"Column {col}, names: {names}, type of names: {type(names)}")
-                self.logger.debug(f"dynamic-table-{split_cols}-{str(split_vals).replace(' ', '')}")
 
                 columns.append({
                     "id": col,
@@ -394,7 +481,6 @@ class DataTableService:
                     col, col_type, column_config, names, pivot_cols,
                     bool(split_cols and split_vals)))
                 column_styles.extend(self.create_column_styles(col, column_config))
-            self.logger.debug(f"column_styles {column_styles}")
 
             # Apply mapping functions to relevant columns
             for col in df.columns:
@@ -402,18 +488,17 @@ class DataTableService:
                     values = df[col].fillna('').tolist()  # Convert Series to list
                     mapped_values = self.formatting_service.format_value(values)
                     df[col] = mapped_values
-            # Handle column visibility
-            visibility_map = {
-                'market_share': 'market_share' in value_types,
-                'rank': 'rank' in value_types,
-                'change': 'base_change' in value_types,
-                'base': 'base' in value_types
-            }
-            hidden_cols = [
-                col for col in df.columns
-                if any(not show for key, show in visibility_map.items()
-                       if key in col)
-            ]
+
+            # Flag aggregate rows once instead of one style rule per row
+            df[self.HIGHLIGHT_COL] = self._get_highlight_flags(df, index_cols)
+            columns.append({
+                "id": self.HIGHLIGHT_COL,
+                "name": [''] * len(columns[0]['name']) if columns else '',
+                "type": 'numeric',
+                "format": None
+            })
+            hidden_cols = [*hidden_cols, self.HIGHLIGHT_COL]
+
             return {
                 'id':
                 f"dynamic-table-{split_cols}-{str(split_vals).replace(' ', '')}",
@@ -428,14 +513,7 @@ class DataTableService:
                 'data': df.to_dict('records'),
                 'style_header_conditional': header_styles,
                 'style_data_conditional': [
-                    *[{'if': {'row_index': i},
-                       'backgroundColor': '#eeeff0',
-                       'color': '#212529'}
-                      for i, row in enumerate(df.to_dict('records'))
-                      if any(kw in str(v).lower()
-                             for v in row.values()
-                             for kw in {'top', 'топ',
-                                        'весь рынок', 'всего'} if v)],
+                    self.HIGHLIGHT_STYLE,
                     *column_styles,
                     {'if': {'state': 'active'},
                      'backgroundColor': 'rgba(0, 116, 217, 0.1)'}
@@ -444,4 +522,15 @@ class DataTableService:
             }
         except Exception as e:
             self.logger.error(f"Datatable creation error: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _get_highlight_flags(self, df: pd.DataFrame,
+                             index_cols: List[str]) -> pd.Series:
+        """Flag rows whose label columns contain a highlight keyword."""
+        pattern = '|'.join(map(re.escape, self.HIGHLIGHT_KEYWORDS))
+        flags = pd.Series(False, index=df.index)
+        for col in index_cols:
+            if col in df.columns:
+                flags |= (df[col].astype(str).str.lower()
+                          .str.contains(pattern, regex=True))
+        return flags.astype(int)
\ No newline at end of file
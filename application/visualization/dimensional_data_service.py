@@ -1,6 +1,7 @@
 # application/services/data_processing_service.py
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
-import itertools
 
 
 class DimensionalDataService:
@@ -32,7 +33,14 @@ class DimensionalDataService:
         split_cols,
         max_combinations=5
     ):
-        """Create multi-dimensional results based on insurers and dimension splits."""
+        """Create multi-dimensional results based on insurers and dimension splits.
+
+        Dimensions are encoded once against their requested orderings and
+        rows are grouped by split key in a single pass. Only split keys
+        present in the data are kept, capped to max_combinations before any
+        segment is built.
+        """
+        is_top_n = bool(selected_insurers) and selected_insurers[0].startswith('top-')
 
         # Get ordered insurers for the initial configuration
         ordered_insurers = self.get_ordered_insurers(
@@ -47,78 +55,123 @@ class DimensionalDataService:
             self.columns.VALUE_TYPE: ordered_value_types,
             self.columns.YEAR_QUARTER: ordered_quarters
         }
+        split_dims = [col for col in split_cols if col in dimension_config]
+        self.logger.debug("split_cols %s, selected_insurers %s", split_dims, selected_insurers)
 
-        split_values = {col: dimension_config[col]
-                        for col in split_cols
-                        if col in dimension_config}
-        self.logger.debug(f"split_cols {split_cols}")
-        self.logger.debug(f"split_values {split_values}")
-        self.logger.debug(f"selected_insurers {selected_insurers}")
-        split_combinations = [
-            dict(zip(split_cols, combo))
-            for combo in itertools.product(*split_values.values())]
-        self.logger.debug(f"split_combinations {split_combinations}")
-
-        # Limit the number of combinations to process
-        split_combinations = split_combinations[:max_combinations]
-        self.logger.debug(f"Limited to {len(split_combinations)} combinations")
+        # One categorical encoding per dimension (-1 for values not requested)
+        codes = {col: self._encode(processed_df[col], vals)
+                 for col, vals in dimension_config.items()}
 
-        result_dfs = []
+        # Rows within the requested dimension values; with top-N the insurer
+        # list depends on the segment, so insurers are resolved per segment
+        mask = np.logical_and.reduce([
+            code >= 0 for col, code in codes.items()
+            if not (is_top_n and split_dims and col == self.columns.INSURER)])
+
+        segments = self._get_split_segments(
+            codes, dimension_config, split_dims, mask, max_combinations)
+        self.logger.debug("Limited to %d combinations", len(segments))
 
-        for split_combo in split_combinations:
-            self.logger.debug(f"split_combo {split_combo}")
-
-            current_split_config = dimension_config.copy()
-
-            if selected_insurers[0].startswith('top-'):
-                filtered_df = processed_df
-                for col, val in split_combo.items():
-                    filtered_df = filtered_df[filtered_df[col] == val]
-                current_dim_insurers = self.get_ordered_insurers(
-                        filtered_df, selected_insurers, ordered_metrics)
-                current_split_config[self.columns.INSURER] = current_dim_insurers
-
-            for col in split_combo.keys():
-                current_split_config[col] = [split_combo[col]]
-
-            # Create all dimension combinations for this segment
-            dimension_combinations = pd.DataFrame(
-                list(itertools.product(
-                    *[vals for vals in current_split_config.values()])),
-                columns=list(current_split_config.keys()))
-
-            # Get existing combinations from the input dataframe for these dimensions
-            existing_combos = processed_df[list(current_split_config.keys())].drop_duplicates()
-
-            # Filter dimension_combinations to only keep existing combinations
-            dimension_combinations = pd.merge(
-                dimension_combinations,
-                existing_combos,
-                how='inner',
-                on=list(current_split_config.keys())
-            )
-
-            # Merge with actual data (now using inner join since we know combinations exist)
-            current_split_data = pd.merge(
-                dimension_combinations,
-                processed_df,
-                on=list(current_split_config.keys()),
-                how='inner')
-
-            # Apply consistent formatting and sorting
-            for col, vals in current_split_config.items():
-                if vals is not None:
-                    current_split_data[col] = current_split_data[col].astype(
-                        pd.CategoricalDtype(vals, ordered=True))
-
-            current_split_data = current_split_data.sort_values(
-                by=list(current_split_config.keys()))
-
-            # Format time periods consistently
-            current_split_data[self.columns.YEAR_QUARTER] = (
-                current_split_data[self.columns.YEAR_QUARTER].astype(
-                    str) + 'T00:00:00').astype('category')
-
-            result_dfs.append((current_split_data, list(split_combo.keys()), list(split_combo.values())))
-
-        return result_dfs
\ No newline at end of file
+        result_dfs = []
+        for split_combo, split_rows in segments:
+            segment_codes = dict(codes)
+            segment_config = dict(dimension_config)
+
+            if is_top_n and split_dims:
+                segment_config[self.columns.INSURER] = self.get_ordered_insurers(
+                    processed_df.iloc[split_rows], selected_insurers,
+                    ordered_metrics)
+                segment_codes[self.columns.INSURER] = self._encode(
+                    processed_df[self.columns.INSURER],
+                    segment_config[self.columns.INSURER])
+
+            for col, val in split_combo.items():
+                segment_config[col] = [val]
+                segment_codes[col] = np.zeros(len(processed_df), dtype=np.intp)
+
+            rows = split_rows[mask[split_rows]]
+            if is_top_n and split_dims:
+                rows = rows[segment_codes[self.columns.INSURER][rows] >= 0]
+
+            current_split_data = self._build_segment(
+                processed_df, rows, segment_config, segment_codes)
+            result_dfs.append(
+                (current_split_data, list(split_combo.keys()),
+                 list(split_combo.values())))
+
+        return result_dfs
+
+    @staticmethod
+    def _encode(values: pd.Series, ordered: Optional[List[Any]]) -> np.ndarray:
+        """Encode values by their position in the requested ordering."""
+        if ordered is None:
+            return pd.factorize(values, sort=False)[0]
+        return pd.Index(ordered).get_indexer(values)
+
+    def _get_split_segments(
+        self,
+        codes: Dict[str, np.ndarray],
+        dimension_config: Dict[str, List[Any]],
+        split_dims: List[str],
+        mask: np.ndarray,
+        max_combinations: int
+    ) -> List[Tuple[Dict[str, Any], np.ndarray]]:
+        """Group row positions by split key in requested order.
+
+        Returns each present split combination with the positions of all
+        rows carrying that key, ordered like the product of split values.
+        """
+        if not split_dims:
+            return [({}, np.arange(len(mask)))]
+
+        shape = [max(len(dimension_config[col]), 1) for col in split_dims]
+        split_codes = [codes[col] for col in split_dims]
+        valid = np.logical_and.reduce([c >= 0 for c in split_codes])
+        flat = np.full(len(mask), -1, dtype=np.int64)
+        flat[valid] = np.ravel_multi_index(
+            [c[valid] for c in split_codes], shape)
+
+        # Cap on keys that have rows to show before building anything
+        keys = np.unique(flat[valid & mask])[:max_combinations]
+        groups = pd.Series(flat).groupby(flat, sort=True).indices
+
+        segments = []
+        for key in keys:
+            levels = np.unravel_index(key, shape)
+            split_combo = {col: dimension_config[col][level]
+                           for col, level in zip(split_dims, levels)}
+            segments.append((split_combo, groups[key]))
+        return segments
+
+    def _build_segment(
+        self,
+        processed_df: pd.DataFrame,
+        rows: np.ndarray,
+        segment_config: Dict[str, List[Any]],
+        segment_codes: Dict[str, np.ndarray]
+    ) -> pd.DataFrame:
+        """Slice, type and sort one segment using precomputed codes."""
+        dims = list(segment_config.keys())
+        # Stable sort by dimension codes keeps input order within ties
+        order = rows[np.lexsort(
+            [segment_codes[col][rows] for col in reversed(dims)])]
+
+        data = {}
+        for col in dims:
+            vals = segment_config[col]
+            if vals is None:
+                data[col] = processed_df[col].take(order).reset_index(drop=True)
+            else:
+                data[col] = pd.Categorical.from_codes(
+                    segment_codes[col][order],
+                    dtype=pd.CategoricalDtype(vals, ordered=True))
+        for col in processed_df.columns:
+            if col not in segment_config:
+                data[col] = processed_df[col].take(order).reset_index(drop=True)
+        current_split_data = pd.DataFrame(data)
+
+        # Format time periods consistently
+        current_split_data[self.columns.YEAR_QUARTER] = (
+            current_split_data[self.columns.YEAR_QUARTER].astype(
+                str) + 'T00:00:00').astype('category')
+        return current_split_data
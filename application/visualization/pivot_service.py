@@ -1,5 +1,6 @@
 # application/services/pivot_service.py
 from typing import Any, Dict, List, Tuple
+import numpy as np
 import pandas as pd
 
 
@@ -38,51 +39,30 @@ class PivotService:
 
         pivot_cols = [col for col in pivot_cols if col in df.columns]
         index_cols = [col for col in index_cols if col in df.columns]
-
-        df_copy = df.copy()
-        self.logger.debug(f"index_cols {index_cols}")
-
-        # Store original column ordering for each index column
-        original_orders = self._get_original_column_ordering(df_copy, index_cols)
-        self.logger.debug(f"original_orders {original_orders}")
+        self.logger.debug("index_cols %s", index_cols)
 
         # Create pivot column hierarchies
-        pivot_values = self._get_pivot_values(df_copy, pivot_cols)
-        self.logger.debug(f"pivot_values {pivot_values}")
-
-        # Create the combined pivot key column
-        df_copy = self._create_pivot_key_column(df_copy, pivot_cols, separator)
+        pivot_values = self._get_pivot_values(df, pivot_cols)
+        self.logger.debug("pivot_values %s", pivot_values)
 
-        # Create the pivot table
-        result_df = self._create_pivot_table(df_copy, index_cols, values_col=self.columns.VALUE)
+        # Encode rows by first-appearance order and columns by pivot order
+        row_codes, row_values = self._encode_index(df, index_cols)
+        col_codes, col_keys = self._encode_pivot(df, pivot_cols, pivot_values)
 
-        # Restore original ordering and sort
-        result_df = self._restore_ordering_and_sort(result_df, index_cols, original_orders)
+        # Scatter values into a preallocated 2D array
+        values = self._scatter_values(
+            df[self.columns.VALUE].to_numpy(dtype=object),
+            row_codes, col_codes, len(row_values[0]) if row_values else 1,
+            len(col_keys))
 
-        # Generate ordered column list (preserving hierarchy)
-        ordered_col_values = self._generate_ordered_columns(pivot_cols, pivot_values, separator)
-
-        # Create final column list with index columns and ordered pivot columns
-        result_df = self._finalize_columns(result_df, index_cols, ordered_col_values)
-
-        # Format the dataframe for display
-        result_df = self._format_dataframe(result_df, index_cols)
+        # Create final frame with index columns and ordered pivot columns
+        result_df = self._build_frame(
+            index_cols, row_values, col_keys, values, separator)
 
         # Note: The original function returned a tuple with a second element that wasn't used
         # For compatibility, we'll return an empty list as the second element
         return result_df
 
-    def _get_original_column_ordering(
-        self,
-        df: pd.DataFrame,
-        index_cols: List[str]
-    ) -> Dict[str, List[Any]]:
-        """Store original column ordering for each index column."""
-        return {
-            col: pd.Series(df[col].unique()).tolist()
-            for col in index_cols
-        }
-
     def _get_pivot_values(
         self,
         df: pd.DataFrame,
@@ -105,109 +85,115 @@ class PivotService:
             pivot_values[col] = values
         return pivot_values
 
-    def _create_pivot_key_column(
+    def _encode_index(
         self,
         df: pd.DataFrame,
-        pivot_cols: List[str],
-        separator: str
-    ) -> pd.DataFrame:
-        """Create a combined pivot key column."""
-        df['_pivot_key'] = ''
-        for col in pivot_cols:
-            df['_pivot_key'] += df[col].astype(str) + separator
-        df['_pivot_key'] = df['_pivot_key'].str[:-len(separator)]
-        return df
+        index_cols: List[str]
+    ) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Encode index rows over the product of index column values.
 
-    def _create_pivot_table(
-        self,
-        df: pd.DataFrame,
-        index_cols: List[str],
-        values_col: str
-    ) -> pd.DataFrame:
-        """Create the pivot table."""
-        return pd.pivot_table(
-            data=df,
-            values=values_col,
-            index=index_cols,
-            columns='_pivot_key',
-            aggfunc=lambda x: x.iloc[0] if len(x) > 0 else None,
-            observed=True,
-            dropna=False
-        ).reset_index()
-
-    def _restore_ordering_and_sort(
-        self,
-        df: pd.DataFrame,
-        index_cols: List[str],
-        original_orders: Dict[str, List[Any]]
-    ) -> pd.DataFrame:
-        """Restore original ordering to categorical columns and sort."""
+        Each column keeps the first-appearance order of its values, so rows
+        come out sorted by that order. Returns the row position of every
+        record (-1 for records with a missing index value) and the values of
+        each index column per row.
+        """
+        codes, uniques = [], []
         for col in index_cols:
-            df[col] = pd.Categorical(
-                df[col],
-                categories=original_orders[col],
-                ordered=True
-            )
-        # Sort by index columns
-        return df.sort_values(index_cols)
-
-    def _generate_ordered_columns(
+            col_codes, col_uniques = pd.factorize(df[col], sort=False)
+            codes.append(col_codes)
+            uniques.append(np.asarray(col_uniques, dtype=object))
+
+        if not codes:
+            return np.zeros(len(df), dtype=np.intp), []
+
+        shape = [len(u) for u in uniques]
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        positions = np.full(len(df), -1, dtype=np.intp)
+        positions[valid] = np.ravel_multi_index(
+            [c[valid] for c in codes], shape)
+
+        level_codes = np.unravel_index(np.arange(np.prod(shape)), shape)
+        row_values = [u[lc] for u, lc in zip(uniques, level_codes)]
+        return positions, row_values
+
+    def _encode_pivot(
         self,
+        df: pd.DataFrame,
         pivot_cols: List[str],
-        pivot_values: Dict[str, List[Any]],
-        separator: str
-    ) -> List[str]:
-        """Generate ordered column combinations."""
-        ordered_col_values = []
-
-        def generate_combinations(level=0, current_combo=[]):
-            """Recursive function to generate all combinations of pivot values."""
-            if level == len(pivot_cols):
-                ordered_col_values.append(separator.join(current_combo))
-                return
-            for val in pivot_values[pivot_cols[level]]:
-                generate_combinations(level + 1, current_combo + [str(val)])
-
-        # Generate all ordered combinations
-        generate_combinations()
-        return ordered_col_values
-
-    def _finalize_columns(
+        pivot_values: Dict[str, List[Any]]
+    ) -> Tuple[np.ndarray, List[Tuple[Any, ...]]]:
+        """Encode pivot columns against the ordered pivot values.
+
+        Returns the column position of every record (-1 when a value is not
+        part of the ordering) and the tuple key of each existing column in
+        hierarchical order.
+        """
+        ordered = [list(pivot_values[col]) for col in pivot_cols]
+        codes = [pd.Index(values).get_indexer(df[col])
+                 for col, values in zip(pivot_cols, ordered)]
+
+        if not codes:
+            return np.zeros(len(df), dtype=np.intp), [()]
+
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        flat = np.full(len(df), -1, dtype=np.int64)
+        flat[valid] = np.ravel_multi_index(
+            [c[valid] for c in codes], [max(len(v), 1) for v in ordered])
+
+        # Only combinations present in the data become columns
+        col_keys, col_codes = np.unique(flat[valid], return_inverse=True)
+        positions = np.full(len(df), -1, dtype=np.intp)
+        positions[valid] = col_codes
+
+        level_codes = np.unravel_index(
+            col_keys, [max(len(v), 1) for v in ordered])
+        keys = list(zip(*[[values[i] for i in lc]
+                          for values, lc in zip(ordered, level_codes)]))
+        return positions, keys
+
+    def _scatter_values(
         self,
-        df: pd.DataFrame,
-        index_cols: List[str],
-        ordered_col_values: List[str]
-    ) -> pd.DataFrame:
-        """Create final column list with index columns and ordered pivot columns."""
-        final_cols = index_cols.copy()
-        for combo in ordered_col_values:
-            if combo in df.columns:
-                final_cols.append(combo)
-        # Select only columns that exist
-        return df[final_cols].copy()
-
-    def _format_dataframe(
+        values: np.ndarray,
+        row_codes: np.ndarray,
+        col_codes: np.ndarray,
+        n_rows: int,
+        n_cols: int
+    ) -> np.ndarray:
+        """Place each value at its (row, column) cell, first occurrence wins."""
+        result = np.full(n_rows * n_cols, np.nan, dtype=object)
+        valid = (row_codes >= 0) & (col_codes >= 0)
+        cells = row_codes[valid] * n_cols + col_codes[valid]
+        unique_cells, first = np.unique(cells, return_index=True)
+        result[unique_cells] = values[valid][first]
+        return result.reshape(n_rows, n_cols)
+
+    def _build_frame(
         self,
-        df: pd.DataFrame,
-        index_cols: List[str]
+        index_cols: List[str],
+        row_values: List[np.ndarray],
+        col_keys: List[Tuple[Any, ...]],
+        values: np.ndarray,
+        separator: str
     ) -> pd.DataFrame:
-        """Format the dataframe for display."""
-        # Convert categorical columns to string
-        cat_cols = df.select_dtypes(include=['category']).columns
-        df[cat_cols] = df[cat_cols].astype(str)
-
-        # Replace empty values with '-'
-        df = df.replace([0, ''], '-').fillna('-')
-
-        # Rename columns
-        new_columns = []
-        for col in df.columns:
-            if col in index_cols:
-                # Convert index columns to simple strings
-                new_columns.append(col)
-            else:
-                # Keep value columns as is
-                new_columns.append(col)
-        df.columns = new_columns
-
-        return df
\ No newline at end of file
+        """Assemble the display frame with flat column names."""
+        names = [separator.join(str(v) for v in key) for key in col_keys if key]
+
+        data = {}
+        for col, col_values in zip(index_cols, row_values):
+            data[col] = self._format_values(
+                pd.Index(col_values).astype(str).to_numpy(dtype=object))
+        for i, name in enumerate(names):
+            data[name] = self._format_values(values[:, i])
+
+        return pd.DataFrame(data, columns=index_cols + names).infer_objects()
+
+    @staticmethod
+    def _format_values(values: np.ndarray) -> np.ndarray:
+        """Replace missing, zero and empty values with '-' for display."""
+        blank = pd.isna(values)
+        present = ~blank
+        blank[present] = (values[present] == 0) | (values[present] == '')
+        if blank.any():
+            values = values.copy()
+            values[blank] = '-'
+        return values
@@ -6,42 +6,17 @@ if (!window.dash_clientside) {
 }
 
 window.dash_clientside.clientside = {
-    // Detect viewport size and categorize based on custom breakpoints
-    detectViewport: function(n_intervals) {
-        var width = window.innerWidth;
-        
-        // Store the last detected viewport to avoid unnecessary updates
-        if (!window.lastViewport) {
-            window.lastViewport = '';
-        }
-        
-        // Categorize viewport based on custom breakpoints
-        var viewport;
-        if (width < 390) {
-            viewport = 'xs'; // Extra small
-        } else if (width < 410) {
-            viewport = 'sm'; // Small
-        } else if (width < 530) {
-            viewport = 'md'; // Medium
-        } else if (width < 640) {
-            viewport = 'lg'; // Large
-        } else if (width < 768) {
-            viewport = 'xl'; // Extra large
-        } else if (width < 860) {
-            viewport = 'xxl'; // Extra extra large
-        } else if (width < 1024) {
-            viewport = 'xxxl'; // Triple extra large
-        } else {
-            viewport = 'desktop'; // Desktop and above
-        }
-        
+    // Detect the initial viewport on page load; later changes come from
+    // the debounced resize listener below
+    detectViewport: function() {
+        var viewport = window.viewportBucket(window.innerWidth);
+
         // Only return a new value if the viewport category has changed
         if (viewport !== window.lastViewport) {
-            console.log('Viewport changed to:', viewport, 'at width:', width);
             window.lastViewport = viewport;
             return viewport;
         }
-        
+
         // Return no_update to avoid triggering callbacks when nothing changed
         return dash_clientside.no_update;
     },
@@ -51,23 +26,143 @@ window.dash_clientside.clientside = {
         const rootFontSize = window.getComputedStyle(document.documentElement).fontSize;
         console.log('Current root font size:', rootFontSize);
         return parseFloat(rootFontSize);
+    },
+
+    // Switch table/chart views and hide charts of unselected value types
+    updateVisualizationView: function(viewMode, viewMetrics, payload) {
+        var modes = Array.isArray(viewMode) ? viewMode : [viewMode];
+        var combined = modes.indexOf('combined') !== -1;
+        var classes = ['visualization-root'];
+
+        if (!combined && modes.indexOf('table') === -1) {
+            classes.push('hide-tables');
+        }
+        if (!combined && modes.indexOf('chart') === -1) {
+            classes.push('hide-charts');
+        }
+
+        if (payload && payload.meta) {
+            var selected = window.selectedValueTypes(viewMetrics, payload.meta);
+            payload.meta.value_types.forEach(function(valueType) {
+                if (selected.indexOf(valueType) === -1) {
+                    classes.push('hide-vt-' + valueType);
+                }
+            });
+        }
+
+        // Charts shown after being hidden need their size recomputed
+        setTimeout(function() {
+            window.dispatchEvent(new Event('resize'));
+        }, 0);
+        return classes.join(' ');
+    },
+
+    // Hide value-type columns of every table without a server round trip
+    updateHiddenColumns: function(viewMetrics, payload, allColumns) {
+        if (!payload || !payload.meta || !allColumns) {
+            return dash_clientside.no_update;
+        }
+        var selected = window.selectedValueTypes(viewMetrics, payload.meta);
+        var visibility = {
+            'market_share': selected.indexOf('market_share') !== -1,
+            'rank': selected.indexOf('rank') !== -1,
+            'change': selected.indexOf('base_change') !== -1,
+            'base': selected.indexOf('base') !== -1
+        };
+
+        return allColumns.map(function(columns) {
+            return (columns || []).filter(function(column) {
+                if (column.id === '_highlight') {
+                    return true;
+                }
+                if (column.type === 'text') {
+                    return false;
+                }
+                return Object.keys(visibility).some(function(key) {
+                    return !visibility[key] && column.id.indexOf(key) !== -1;
+                });
+            }).map(function(column) {
+                return column.id;
+            });
+        });
+    },
+
+    // Apply viewport font sizes to rendered charts in place
+    relayoutCharts: function(viewport, viewportFonts) {
+        if (!viewportFonts || !window.Plotly) {
+            return dash_clientside.no_update;
+        }
+        var fonts = viewportFonts[viewport] || viewportFonts['desktop'];
+        var update = {
+            'title.font.size': fonts.title,
+            'legend.font.size': fonts.legend,
+            'font.size': fonts.axis,
+            'xaxis.tickfont.size': fonts.tick,
+            'yaxis.tickfont.size': fonts.tick
+        };
+        document.querySelectorAll('#visualization-root .js-plotly-plot')
+            .forEach(function(chart) {
+                window.Plotly.relayout(chart, update);
+            });
+        return viewport;
+    }
+};
+
+// Value types selected by the view-metrics buttons (mirrors UIService.process_view_metrics)
+window.selectedValueTypes = function(viewMetrics, meta) {
+    var metrics = Array.isArray(viewMetrics) ? viewMetrics : [viewMetrics];
+    var selected = [meta.base];
+
+    Object.keys(meta.view_metrics).forEach(function(mode) {
+        if (metrics.indexOf(mode) !== -1) {
+            selected.push(meta.view_metrics[mode]);
+        }
+    });
+    if (metrics.indexOf(meta.change_mode) !== -1) {
+        selected.push(meta.base + meta.change_suffix);
+        Object.keys(meta.view_metrics).forEach(function(mode) {
+            if (metrics.indexOf(mode) !== -1) {
+                selected.push(meta.view_metrics[mode] + meta.change_suffix);
+            }
+        });
+    }
+    return selected;
+};
+
+// Categorize viewport width based on custom breakpoints
+window.viewportBucket = function(width) {
+    if (width < 390) {
+        return 'xs'; // Extra small
+    } else if (width < 410) {
+        return 'sm'; // Small
+    } else if (width < 530) {
+        return 'md'; // Medium
+    } else if (width < 640) {
+        return 'lg'; // Large
+    } else if (width < 768) {
+        return 'xl'; // Extra large
+    } else if (width < 860) {
+        return 'xxl'; // Extra extra large
+    } else if (width < 1024) {
+        return 'xxxl'; // Triple extra large
     }
+    return 'desktop'; // Desktop and above
 };
 
-// Add a resize event listener for more immediate detection
+// Push viewport changes from debounced resize events instead of polling
 window.addEventListener('resize', function() {
-    // Throttle resize events to avoid excessive calculations
-    if (this.resizeTimeout) {
-        clearTimeout(this.resizeTimeout);
+    if (window.resizeTimeout) {
+        clearTimeout(window.resizeTimeout);
     }
-    
-    this.resizeTimeout = setTimeout(function() {
-        var checkInterval = document.getElementById('viewport-check-interval');
-        if (checkInterval) {
-            // Trigger the interval to check viewport size
-            checkInterval.setAttribute('n_intervals', 
-                parseInt(checkInterval.getAttribute('n_intervals') || 0) + 1);
+
+    window.resizeTimeout = setTimeout(function() {
+        var viewport = window.viewportBucket(window.innerWidth);
+        if (viewport === window.lastViewport || !window.dash_clientside.set_props) {
+            return;
         }
+        console.log('Viewport changed to:', viewport, 'at width:', window.innerWidth);
+        window.lastViewport = viewport;
+        window.dash_clientside.set_props('viewport-size', {data: viewport});
     }, 250);
 });
 
@@ -112,4 +207,70 @@ window.measureChartAndFonts = function() {
 document.addEventListener('DOMContentLoaded', function() {
     // Wait for charts to render
     setTimeout(window.measureChartAndFonts, 1000);
-});
\ No newline at end of file
+});
+
+// Load placeholder sections (.viz-section-slot without .loaded) once they
+// come near the viewport by setting their trigger store
+window.lazySections = (function() {
+    var requested = new WeakMap();
+    var observed = new WeakSet();
+    var scheduled = false;
+
+    function request(slot) {
+        if (slot.classList.contains('loaded') || requested.get(slot) ||
+                !window.dash_clientside.set_props) {
+            return;
+        }
+        requested.set(slot, true);
+        window.dash_clientside.set_props(
+            {type: 'viz-section-trigger', index: Number(slot.dataset.index)},
+            {data: Date.now()}
+        );
+    }
+
+    var io = new IntersectionObserver(function(entries) {
+        entries.forEach(function(entry) {
+            if (entry.isIntersecting) {
+                request(entry.target);
+            }
+        });
+    }, {rootMargin: '200px 0px'});
+
+    function scan() {
+        scheduled = false;
+        document.querySelectorAll('.viz-section-slot').forEach(function(slot) {
+            if (slot.classList.contains('loaded')) {
+                requested.delete(slot);
+                slot.wasLoaded = true;
+                return;
+            }
+            // A loaded slot reset to a placeholder by a re-render is
+            // re-observed so an already visible slot reports again
+            if (slot.wasLoaded || !observed.has(slot)) {
+                slot.wasLoaded = false;
+                io.unobserve(slot);
+                io.observe(slot);
+                observed.add(slot);
+            }
+        });
+    }
+
+    function schedule() {
+        if (!scheduled) {
+            scheduled = true;
+            window.requestAnimationFrame(scan);
+        }
+    }
+
+    document.addEventListener('DOMContentLoaded', function() {
+        new MutationObserver(schedule).observe(document.body, {
+            childList: true,
+            subtree: true,
+            attributes: true,
+            attributeFilter: ['class']
+        });
+        schedule();
+    });
+
+    return {scan: scan};
+})();
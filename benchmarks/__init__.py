@@ -0,0 +1,11 @@
+from benchmarks.synthetic import ScalePoint, SCALE_POINTS, generate_insurance_frame
+from benchmarks.runner import run_benchmarks, compare_to_baseline
+
+
+__all__ = [
+    'ScalePoint',
+    'SCALE_POINTS',
+    'generate_insurance_frame',
+    'run_benchmarks',
+    'compare_to_baseline'
+]
@@ -0,0 +1,131 @@
+# benchmarks/__main__.py
+"""Synthetic-scale benchmarks of the processors and the dashboard pipeline.
+
+    python -m benchmarks                          # small and medium
+    python -m benchmarks --scale large --json out.json
+    python -m benchmarks --scale insurers=300,lines=20 --repeats 5
+    python -m benchmarks --baseline benchmarks/baseline.json --threshold 0.25
+    python -m benchmarks --budgets benchmarks/budgets.json --baseline benchmarks/baseline.json
+    python -m benchmarks --budgets benchmarks/budgets.json --repeats 5 --derive-budgets 1.25 --json benchmarks/baseline.json
+
+--derive-budgets rewrites the budgets of the file as the given multiple
+of this run's medians, widened for noisy stages to the median plus
+--spread times the interquartile range over the square root of
+--repeats; save the run as the baseline alongside it.
+The exit status is 1 if any stage regressed against --baseline, or if a
+stage of --budgets was over its budget or not measured.
+"""
+import argparse
+import json
+import sys
+from typing import List
+
+from benchmarks.runner import (
+    STARTUP, check_budgets, compare_to_baseline, derive_budgets,
+    format_budget_failures, format_report, load_budgets, run_benchmarks
+)
+from benchmarks.synthetic import SCALE_POINTS, ScalePoint
+
+
+def parse_scale(value: str) -> ScalePoint:
+    """A preset name or comma separated overrides of the medium preset."""
+    if value in SCALE_POINTS:
+        return SCALE_POINTS[value]
+    try:
+        overrides = dict(item.split('=', 1) for item in value.split(','))
+        base = SCALE_POINTS['medium'].to_dict()
+        for key, raw in overrides.items():
+            if key not in base or key == 'name':
+                raise ValueError(key)
+            base[key] = type(base[key])(raw)
+        base['name'] = value
+        return ScalePoint(**base)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(
+            f"expected one of {', '.join(SCALE_POINTS)} or key=value pairs "
+            f"(insurers, lines, metrics, quarters, density): {e}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Time processors and the full pipeline on synthetic data.')
+    parser.add_argument('--scale', action='append', type=parse_scale,
+                        help='scale point, repeatable (default: small, medium)')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--baseline', help='report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown per stage (default: 0.2)')
+    parser.add_argument('--budgets', help='budget file to enforce')
+    parser.add_argument('--cold-start', action='store_true',
+                        help='also time importing main.py')
+    parser.add_argument('--derive-budgets', type=float, metavar='MARGIN',
+                        help='set the --budgets file to MARGIN times this run')
+    parser.add_argument('--spread', type=float, default=3.0,
+                        help='IQR/sqrt(repeats) above the median a derived budget allows at least (default: 3)')
+    args = parser.parse_args(argv)
+    if args.derive_budgets and not args.budgets:
+        parser.error('--derive-budgets needs --budgets')
+
+    budgets = load_budgets(args.budgets) if args.budgets else None
+    scales = args.scale or []
+    if budgets:
+        named = {**SCALE_POINTS, **budgets['scales']}
+        for name in budgets['budgets']:
+            if name == STARTUP or any(s.name == name for s in scales):
+                continue
+            if name not in named:
+                parser.error(f"unknown scale '{name}' in {args.budgets}")
+            scales.append(named[name])
+    elif not scales:
+        scales = [SCALE_POINTS['small'], SCALE_POINTS['medium']]
+    cold_start = args.cold_start or bool(
+        budgets and STARTUP in budgets['budgets'])
+    report = run_benchmarks(scales, repeats=args.repeats, seed=args.seed,
+                            cold_start=cold_start)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            comparison = compare_to_baseline(report, json.load(f), args.threshold)
+    print(format_report(report, comparison))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    regressions = [row for row in comparison or [] if row['regression']]
+    for row in regressions:
+        print(f"REGRESSION {row['scale']}/{row['stage']}: "
+              f"{row['baseline_seconds'] * 1000:.1f} ms -> "
+              f"{row['seconds'] * 1000:.1f} ms ({row['change']:+.0%})",
+              file=sys.stderr)
+
+    if args.derive_budgets:
+        with open(args.budgets, encoding='utf-8') as f:
+            data = json.load(f)
+        data['budgets'] = derive_budgets(report, data['budgets'],
+                                         args.derive_budgets, args.spread)
+        with open(args.budgets, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+        budgets['budgets'] = data['budgets']
+        print(f"\nBudgets in {args.budgets} set to the larger of "
+              f"{args.derive_budgets:g}x and median + {args.spread:g} IQR/sqrt(repeats) "
+              f"of this run")
+
+    failures = ''
+    if budgets:
+        budget_rows = check_budgets(report, budgets['budgets'], comparison)
+        failures = format_budget_failures(budget_rows)
+        if failures:
+            print(failures, file=sys.stderr)
+        else:
+            print(f"\nAll {len(budget_rows)} budgets met")
+    return 1 if regressions or failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# benchmarks/replay.py
+"""Replay recorded callback sessions concurrently against the app.
+
+Record a session by starting the app with a record file and using it in
+the browser:
+
+    CALLBACK_RECORD_FILE=sessions.jsonl python main.py
+
+then replay it through the Flask test client of main.server, or over
+HTTP against a running server:
+
+    python -m benchmarks.replay sessions.jsonl --sessions 1 4 8
+    python -m benchmarks.replay sessions.jsonl --url http://127.0.0.1:8051
+
+Every virtual session replays one recorded session in order, round robin
+over the recording, with its own cookies. The report has p50/p95/p99
+latency per callback output and overall throughput per concurrency level.
+
+The app keeps one ProcessingContext for all browsers, so concurrent
+sessions overwrite each other's selections just as real users would;
+the numbers size workers/threads, they do not check results.
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from infrastructure.replay import load_recording
+
+UPDATE_PATH = '/_dash-update-component'
+
+# (status, seconds) of one callback request
+Sender = Callable[[Dict[str, Any]], Tuple[int, float]]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def test_client_sender() -> Callable[[], Sender]:
+    """Sender factory posting through main.server's Flask test client."""
+    from main import app, server
+    path = f"{app.config.url_base_pathname.rstrip('/')}{UPDATE_PATH}"
+
+    def make_sender() -> Sender:
+        client = server.test_client()
+
+        def send(payload: Dict[str, Any]) -> Tuple[int, float]:
+            start = time.perf_counter()
+            response = client.post(path, json=payload)
+            response.get_data()
+            return response.status_code, time.perf_counter() - start
+        return send
+    return make_sender
+
+
+def http_sender(base_url: str, timeout: float) -> Callable[[], Sender]:
+    """Sender factory posting over HTTP; each session keeps its cookies."""
+    url = f"{base_url.rstrip('/')}{UPDATE_PATH}"
+
+    def make_sender() -> Sender:
+        opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+        def send(payload: Dict[str, Any]) -> Tuple[int, float]:
+            body = json.dumps(payload).encode('utf-8')
+            req = urllib.request.Request(url, data=body, headers={
+                'Content-Type': 'application/json',
+                'Accept-Encoding': 'gzip'})
+            start = time.perf_counter()
+            try:
+                with opener.open(req, timeout=timeout) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                e.read()
+                status = e.code
+            return status, time.perf_counter() - start
+        return send
+    return make_sender
+
+
+def replay(recording: List[Dict[str, Any]], make_sender: Callable[[], Sender],
+           sessions: int, iterations: int = 1,
+           pace: bool = False) -> Dict[str, Any]:
+    """Replay the recording with a number of concurrent virtual sessions.
+
+    With pace, each session waits out the recorded gaps between its
+    requests (think time and browser work); otherwise requests are sent
+    back to back.
+    """
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+
+    def run_session(index: int) -> None:
+        send = make_sender()
+        requests = recording[index % len(recording)]['requests']
+        for _ in range(iterations):
+            started = time.perf_counter()
+            for entry in requests:
+                if pace:
+                    delay = entry['offset'] - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                callback = entry.get('callback') or '?'
+                try:
+                    status, seconds = send(entry['payload'])
+                except Exception:
+                    status, seconds = 0, None
+                with lock:
+                    if seconds is not None:
+                        samples[callback].append(seconds)
+                    if not 200 <= status < 300:
+                        errors[callback] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions,
+                            thread_name_prefix='replay') as executor:
+        list(executor.map(run_session, range(sessions)))
+    wall = time.perf_counter() - start
+
+    callbacks = {
+        callback: {
+            'count': len(values),
+            'errors': errors.get(callback, 0),
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'max_ms': max(values) * 1000
+        }
+        for callback, values in sorted(samples.items())
+    }
+    total = sum(len(values) for values in samples.values())
+    return {
+        'sessions': sessions,
+        'iterations': iterations,
+        'requests': total,
+        'errors': sum(errors.values()),
+        'wall_seconds': wall,
+        'throughput_rps': total / wall if wall else 0.0,
+        'callbacks': callbacks
+    }
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    lines = []
+    for result in results:
+        lines.append(
+            f"\n{result['sessions']} sessions: {result['requests']} requests "
+            f"in {result['wall_seconds']:.2f}s -> "
+            f"{result['throughput_rps']:.1f} req/s, {result['errors']} errors")
+        lines.append(f"{'callback':<60}{'n':>6}{'err':>5}"
+                     f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for callback, stats in result['callbacks'].items():
+            name = callback if len(callback) <= 58 else callback[:55] + '...'
+            lines.append(
+                f"{name:<60}{stats['count']:>6}{stats['errors']:>5}"
+                f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}"
+                f"{stats['p99_ms']:>9.1f}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.replay',
+        description='Replay recorded Dash callback sessions concurrently.')
+    parser.add_argument('recording', help='JSON lines file from CALLBACK_RECORD_FILE')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4],
+                        help='concurrent sessions, one run per value')
+    parser.add_argument('--iterations', type=int, default=1,
+                        help='times each session replays its recording')
+    parser.add_argument('--url', help='replay over HTTP against a running server')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--pace', action='store_true',
+                        help='keep the recorded gaps between requests')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args(argv)
+
+    recording = load_recording(args.recording)
+    if not recording:
+        parser.error(f"no callback requests in {args.recording}")
+    make_sender = (http_sender(args.url, args.timeout) if args.url
+                   else test_client_sender())
+
+    # Warm caches and lazy imports so the first level is not penalised
+    replay(recording[:1], make_sender, sessions=1)
+    results = [replay(recording, make_sender, sessions=n,
+                      iterations=args.iterations, pace=args.pace)
+               for n in args.sessions]
+    print(format_results(results))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'recording': args.recording, 'results': results}, f,
+                      indent=2)
+    return 1 if any(result['errors'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,407 @@
+# benchmarks/runner.py
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from application.bootstrap import AppConfiguration
+from application.config import (
+    AppConfig, Columns, ValueTypes, SpecialValues,
+    DefaultValues, ViewModes, FormatConfig,
+    METRICS_FOR_MARKET_SHARE
+)
+from application.core.service_factory import ServiceFactory
+from benchmarks.synthetic import (
+    BENCHMARK_METRICS, ScalePoint, generate_insurance_frame, synthetic_lines
+)
+from domain import METRICS_MAPPING, MetricsFormulas
+from infrastructure.logger import logger, dash_callback
+
+PIPELINE_STEPS = ('process_dashboard_data', 'prepare_visualization_data',
+                  'create_visualizations')
+STARTUP = 'startup'
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLD_START_SCRIPT = (
+    "import sys, main\n"
+    "from infrastructure.startup import startup\n"
+    "open(sys.argv[1], 'w').write(startup.to_json())\n"
+)
+
+
+class StageRecorder:
+    """Drop-in pipe_with_logging that keeps per-step timings.
+
+    Steps used more than once in a run (filter_by_column) get a #n suffix
+    so every call keeps its own row. With trace_memory, the tracemalloc
+    peak of each step is recorded as well; tracing slows the steps down,
+    so timings and peaks come from separate runs.
+    """
+
+    def __init__(self):
+        self.trace_memory = False
+        self.seconds: Dict[str, List[float]] = defaultdict(list)
+        self.peaks: Dict[str, int] = {}
+        self._calls: Dict[str, int] = defaultdict(int)
+
+    def start_run(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self._calls.clear()
+
+    def __call__(self, df: pd.DataFrame, func: Callable, *args: Any,
+                 **kwargs: Any) -> Any:
+        name = getattr(func, '__name__', 'unnamed_step')
+        self._calls[name] += 1
+        if self._calls[name] > 1:
+            name = f"{name}#{self._calls[name]}"
+
+        if not self.trace_memory:
+            start = time.perf_counter()
+            result = func(df, *args, **kwargs)
+            self.seconds[name].append(time.perf_counter() - start)
+            return result
+
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = func(df, *args, **kwargs)
+        self.peaks[name] = tracemalloc.get_traced_memory()[1] - base
+        return result
+
+
+def build_config(pipe: Callable) -> AppConfiguration:
+    """Application configuration as in bootstrap, with the given pipe."""
+    return AppConfiguration(
+        app_config=AppConfig,
+        columns=Columns,
+        value_types=ValueTypes,
+        special_values=SpecialValues,
+        default_values=DefaultValues,
+        view_modes=ViewModes,
+        format_config=FormatConfig,
+        metrics_mapping=METRICS_MAPPING,
+        metrics_formulas=MetricsFormulas,
+        metrics_for_market_share=METRICS_FOR_MARKET_SHARE,
+        debug_handler=None,
+        logger=logger,
+        dash_callback=dash_callback,
+        pipe_with_logging=pipe
+    )
+
+
+def run_scale(scale: ScalePoint, repeats: int = 3, seed: int = 0,
+              viewport_size: str = 'desktop') -> Dict[str, Any]:
+    """Benchmark the processors and the full pipeline at one scale point.
+
+    The processors run inside ProcessOrchestrator.process_dashboard_data,
+    so each step sees exactly the frame it gets in the app. Every value
+    type is on and sections are built as tables and charts, so rank,
+    market share and both builders are measured. Reported times are
+    medians over the repeats, with their interquartile range; peaks come
+    from one extra run under tracemalloc.
+    """
+    df = generate_insurance_frame(scale, seed=seed)
+    recorder = StageRecorder()
+    bundle = ServiceFactory(build_config(recorder)).create_all_services(df, df)
+    orchestrator, context = bundle.processor_orchestrator, bundle.context
+    vt = ValueTypes
+    context.update_state(lines=synthetic_lines(scale.lines),
+                         metrics=list(BENCHMARK_METRICS),
+                         value_types=[vt.BASE, vt.MARKET_SHARE, vt.RANK,
+                                      vt.BASE_CHANGE, vt.MARKET_SHARE_CHANGE,
+                                      vt.RANK_CHANGE],
+                         view_mode=['table', 'chart'])
+
+    steps = [getattr(orchestrator, name) for name in PIPELINE_STEPS[:2]]
+    steps.append(lambda: orchestrator.create_visualizations(viewport_size))
+
+    pipeline: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(repeats):
+        recorder.start_run()
+        for name, step in zip(PIPELINE_STEPS, steps):
+            start = time.perf_counter()
+            step()
+            pipeline[name].append(time.perf_counter() - start)
+        # Summed over worker threads, so they isolate the table
+        # (PivotService, DataTableService) and chart builders from the pool
+        timings = orchestrator.section_timings
+        pipeline['build_tables'].append(
+            sum(t['table_ms'] for t in timings) / 1000)
+        pipeline['build_charts'].append(
+            sum(t['charts_ms'] for t in timings) / 1000)
+
+    pipeline_peaks: Dict[str, int] = {}
+    recorder.start_run(trace_memory=True)
+    tracemalloc.start()
+    try:
+        for name, step in zip(PIPELINE_STEPS, steps):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            step()
+            pipeline_peaks[name] = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    stages = {name: _stage(values, recorder.peaks.get(name))
+              for name, values in recorder.seconds.items()}
+    for name in (*PIPELINE_STEPS, 'build_tables', 'build_charts'):
+        stages[name] = _stage(pipeline[name], pipeline_peaks.get(name))
+    totals = [sum(runs) for runs in zip(*(pipeline[name] for name in PIPELINE_STEPS))]
+    stages['pipeline_total'] = _stage(totals, max(pipeline_peaks.values()))
+    return {
+        'scale': scale.to_dict(),
+        'rows': len(df),
+        'sections': orchestrator.get_section_count(),
+        'stages': stages
+    }
+
+
+def measure_cold_start(repeats: int = 3) -> Dict[str, Any]:
+    """Time `import main` in fresh interpreters.
+
+    This covers imports, data loading, service and layout creation and
+    callback registration, i.e. everything before the server starts.
+    cold_start is the wall time of the whole interpreter; the phases
+    recorded by infrastructure.startup are reported as their own stages.
+    If the import fails (e.g. the data files are missing), the result has
+    no stages and its 'error' holds the last line of the traceback.
+    """
+    result: Dict[str, Any] = {
+        'scale': {'name': STARTUP},
+        'rows': None,
+        'sections': None,
+        'stages': {}
+    }
+    runs = []
+    phases: Dict[str, List[float]] = defaultdict(list)
+    with tempfile.TemporaryDirectory() as tmp:
+        phases_file = os.path.join(tmp, 'phases.json')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            process = subprocess.run(
+                [sys.executable, '-c', COLD_START_SCRIPT, phases_file],
+                cwd=REPO_ROOT, stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE, text=True)
+            if process.returncode != 0:
+                lines = process.stderr.strip().splitlines()
+                result['error'] = (lines[-1] if lines
+                                   else f"exit status {process.returncode}")
+                return result
+            runs.append(time.perf_counter() - start)
+            with open(phases_file, encoding='utf-8') as f:
+                for name, seconds in json.load(f).items():
+                    phases[name].append(seconds)
+
+    stages = result['stages']
+    stages['cold_start'] = _stage(runs)
+    for name, values in phases.items():
+        stages[f"startup_{name}"] = _stage(values)
+    return result
+
+
+def _stage(seconds: List[float], peak_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """Median and interquartile range of a stage's runs, with its peak."""
+    iqr = 0.0
+    if len(seconds) > 1:
+        q1, _, q3 = statistics.quantiles(seconds, n=4, method='inclusive')
+        iqr = q3 - q1
+    return {'seconds': statistics.median(seconds), 'iqr_seconds': iqr,
+            'peak_bytes': peak_bytes}
+
+
+def run_benchmarks(scales: List[ScalePoint], repeats: int = 3,
+                   seed: int = 0, cold_start: bool = False) -> Dict[str, Any]:
+    """Run every scale point; the result is what --json writes."""
+    logging.disable(logging.INFO)  # Keep debug logging out of the timings
+    try:
+        results = [run_scale(scale, repeats=repeats, seed=seed)
+                   for scale in scales]
+    finally:
+        logging.disable(logging.NOTSET)
+    if cold_start:
+        results.append(measure_cold_start(repeats))
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'repeats': repeats,
+        'seed': seed,
+        'results': results
+    }
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        threshold: float = 0.2,
+                        min_seconds: float = 0.005) -> List[Dict[str, Any]]:
+    """Per-stage comparison against a saved report.
+
+    A stage regresses when it is more than threshold slower than in the
+    baseline and the difference exceeds min_seconds, so that jitter on
+    sub-millisecond steps does not fail a run.
+    """
+    baseline_stages = {
+        result['scale']['name']: result['stages']
+        for result in baseline.get('results', [])
+    }
+    rows = []
+    for result in report['results']:
+        scale_name = result['scale']['name']
+        previous = baseline_stages.get(scale_name, {})
+        for stage, values in result['stages'].items():
+            if stage not in previous:
+                continue
+            before, after = previous[stage]['seconds'], values['seconds']
+            change = (after - before) / before if before else 0.0
+            rows.append({
+                'scale': scale_name,
+                'stage': stage,
+                'baseline_seconds': before,
+                'seconds': after,
+                'change': change,
+                'regression': change > threshold and after - before > min_seconds
+            })
+    return rows
+
+
+def format_report(report: Dict[str, Any],
+                  comparison: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Plain text table of a report, with baseline changes when given."""
+    changes = {(row['scale'], row['stage']): row for row in comparison or []}
+    lines = []
+    for result in report['results']:
+        scale = result['scale']
+        if scale['name'] == STARTUP:
+            lines.append(f"\n{STARTUP}: import main in a fresh interpreter")
+            if 'error' in result:
+                lines.append(f"failed: {result['error']}")
+                continue
+        else:
+            lines.append(
+                f"\n{scale['name']}: {scale['insurers']} insurers, "
+                f"{scale['lines']} lines, {scale['metrics']} metrics, "
+                f"{scale['quarters']} quarters -> {result['rows']:,} rows, "
+                f"{result['sections']} sections")
+        lines.append(f"{'stage':<32}{'median ms':>12}{'peak MiB':>12}"
+                     f"{'baseline ms':>14}{'change':>10}")
+        for stage, values in result['stages'].items():
+            peak = values['peak_bytes']
+            row = changes.get((scale['name'], stage))
+            baseline = (f"{row['baseline_seconds'] * 1000:.1f}" if row else '-')
+            change = (f"{row['change']:+.0%}{' !' if row['regression'] else ''}"
+                      if row else '-')
+            peak_mib = f"{peak / 2 ** 20:.1f}" if peak is not None else '-'
+            lines.append(
+                f"{stage:<32}{values['seconds'] * 1000:>12.1f}{peak_mib:>12}"
+                f"{baseline:>14}{change:>10}")
+    return '\n'.join(lines)
+
+
+def load_budgets(path: str) -> Dict[str, Any]:
+    """Read a budget file.
+
+    {"scales": {name: {scale point fields}},
+     "budgets": {scale name: {stage: max milliseconds}}}
+
+    Scale names are presets, entries of "scales" or "startup" for the
+    cold start. Each named scale is returned as a ScalePoint.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    scales = {name: ScalePoint(name=name, **fields)
+              for name, fields in data.get('scales', {}).items()}
+    return {'scales': scales, 'budgets': data.get('budgets', {})}
+
+
+def check_budgets(report: Dict[str, Any], budgets: Dict[str, Dict[str, float]],
+                  comparison: Optional[List[Dict[str, Any]]] = None
+                  ) -> List[Dict[str, Any]]:
+    """One row per budget: measured vs allowed time, with the baseline.
+
+    Budgets whose scale or stage was not measured are reported as
+    missing, so a renamed step does not silently drop its budget, and
+    those of a scale that failed to run as failed, with its error.
+    """
+    measured = {result['scale']['name']: result['stages']
+                for result in report['results']}
+    errors = {result['scale']['name']: result['error']
+              for result in report['results'] if 'error' in result}
+    baseline = {(row['scale'], row['stage']): row['baseline_seconds']
+                for row in comparison or []}
+    rows = []
+    for scale_name, stages in budgets.items():
+        for stage, max_ms in stages.items():
+            values = measured.get(scale_name, {}).get(stage)
+            ms = values['seconds'] * 1000 if values else None
+            before = baseline.get((scale_name, stage))
+            rows.append({
+                'scale': scale_name,
+                'stage': stage,
+                'budget_ms': max_ms,
+                'ms': ms,
+                'baseline_ms': before * 1000 if before is not None else None,
+                'status': ('failed' if scale_name in errors
+                           else 'missing' if ms is None
+                           else 'over' if ms > max_ms else 'ok'),
+                'error': errors.get(scale_name)
+            })
+    return rows
+
+
+def derive_budgets(report: Dict[str, Any], budgets: Dict[str, Dict[str, float]],
+                   margin: float, spread: float) -> Dict[str, Dict[str, float]]:
+    """The same budgets set from the report's medians and run-to-run spread.
+
+    Each budget is margin times the median, or, if that is larger, the
+    median plus spread times the interquartile range of the runs over
+    the square root of the repeats: the noise of a median of that many
+    runs, so noisy stages do not fail on jitter. Values are rounded up to
+    10 ms, and are at least 10 ms. Stages the report did not measure keep
+    their current budget.
+    """
+    measured = {result['scale']['name']: result['stages']
+                for result in report['results']}
+    noise = spread / math.sqrt(report.get('repeats') or 1)
+    derived: Dict[str, Dict[str, float]] = {}
+    for scale_name, stages in budgets.items():
+        derived[scale_name] = {}
+        for stage, max_ms in stages.items():
+            values = measured.get(scale_name, {}).get(stage)
+            if values is not None:
+                seconds = max(values['seconds'] * margin,
+                              values['seconds'] + noise * values.get('iqr_seconds', 0.0))
+                max_ms = max(1, math.ceil(seconds * 100)) * 10
+            derived[scale_name][stage] = max_ms
+    return derived
+
+
+def format_budget_failures(rows: List[Dict[str, Any]]) -> str:
+    """Diff of the budgets that failed, empty if all were met."""
+    lines = []
+    for row in rows:
+        if row['status'] == 'ok':
+            continue
+        name = f"{row['scale']}/{row['stage']}"
+        if row['status'] == 'failed':
+            lines.append(f"BUDGET {name}: failed to run ({row['error']})")
+            continue
+        if row['status'] == 'missing':
+            lines.append(f"BUDGET {name}: not measured "
+                         f"(budget {row['budget_ms']:.1f} ms)")
+            continue
+        over = row['ms'] / row['budget_ms'] - 1
+        line = (f"BUDGET {name}: {row['ms']:.1f} ms > "
+                f"{row['budget_ms']:.1f} ms budget ({over:+.0%})")
+        if row['baseline_ms']:
+            line += (f"; baseline {row['baseline_ms']:.1f} ms "
+                     f"({row['ms'] / row['baseline_ms'] - 1:+.0%})")
+        lines.append(line)
+    return '\n'.join(lines)
@@ -0,0 +1,106 @@
+# benchmarks/startup.py
+"""Per-module import and init timing breakdown of main.py.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --top 40 --json startup.json
+
+Runs `import main` in a fresh interpreter under -X importtime and prints
+the slowest modules by cumulative import time, the self time summed per
+top-level package, and the startup phases recorded by
+infrastructure.startup (imports, data loading, services, layout,
+callbacks). importtime adds some overhead of its own, so use the cold
+start stages of `python -m benchmarks --cold-start` for before/after
+comparisons.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from benchmarks.runner import COLD_START_SCRIPT, REPO_ROOT
+
+IMPORT_LINE = re.compile(
+    r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """Modules from -X importtime output, in import completion order."""
+    modules = []
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': (len(indent) - 1) // 2
+            })
+    return modules
+
+
+def profile_startup() -> Dict[str, Any]:
+    """Import breakdown and startup phases of one fresh `import main`."""
+    with tempfile.TemporaryDirectory() as tmp:
+        phases_file = os.path.join(tmp, 'phases.json')
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', COLD_START_SCRIPT,
+             phases_file],
+            cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            text=True)
+        if process.returncode:
+            raise RuntimeError(f"import main failed:\n{process.stderr[-2000:]}")
+        with open(phases_file, encoding='utf-8') as f:
+            phases = json.load(f)
+
+    modules = parse_importtime(process.stderr)
+    packages: Dict[str, float] = defaultdict(float)
+    for module in modules:
+        packages[module['module'].split('.')[0]] += module['self_ms']
+    return {
+        'phases_ms': {name: seconds * 1000 for name, seconds in phases.items()},
+        'packages_ms': dict(sorted(packages.items(), key=lambda item: -item[1])),
+        'modules': modules
+    }
+
+
+def format_profile(profile: Dict[str, Any], top: int = 25) -> str:
+    lines = ['Startup phases']
+    for name, ms in profile['phases_ms'].items():
+        lines.append(f"  {name:<28}{ms:>10.1f} ms")
+
+    lines.append(f"\nImport self time by package (top {top})")
+    for name, ms in list(profile['packages_ms'].items())[:top]:
+        lines.append(f"  {name:<28}{ms:>10.1f} ms")
+
+    lines.append(f"\nSlowest imports by cumulative time (top {top})")
+    slowest = sorted(profile['modules'], key=lambda m: -m['cumulative_ms'])
+    for module in slowest[:top]:
+        lines.append(f"  {module['module']:<48}{module['cumulative_ms']:>10.1f} ms"
+                     f"{module['self_ms']:>10.1f} ms self")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.startup',
+        description='Import and init timing breakdown of main.py.')
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--json', help='write the full breakdown to this file')
+    args = parser.parse_args(argv)
+
+    profile = profile_startup()
+    print(format_profile(profile, args.top))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# benchmarks/synthetic.py
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from application.config import Columns, DefaultValues, SpecialValues
+from domain.formulas import MetricsFormulas
+
+# Raw metrics of form 0420162, in the order the formulas define them
+RAW_METRICS = [
+    'direct_premiums', 'direct_losses', 'inward_premiums', 'inward_losses',
+    'ceded_premiums', 'ceded_losses', 'new_contracts', 'contracts_end',
+    'premiums_interm', 'commissions_interm', 'new_sums', 'sums_end',
+    'claims_reported', 'claims_settled'
+]
+
+# Selection the benchmarks run with: the default metrics plus calculated
+# metrics from the app's tree covering add, subtract, divide and metrics
+# built on other calculated metrics, so calculate_metrics does formula work
+BENCHMARK_METRICS = list(DefaultValues.METRICS) + [
+    'total_premiums', 'net_result', 'net_loss_ratio', 'reinsurance_effect'
+]
+
+
+@dataclass(frozen=True)
+class ScalePoint:
+    """Size of a synthetic dataset."""
+    name: str
+    insurers: int
+    lines: int
+    metrics: int
+    quarters: int
+    density: float = 0.8  # Share of insurer/line/metric combinations reported
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+SCALE_POINTS: Dict[str, ScalePoint] = {
+    'small': ScalePoint('small', insurers=50, lines=5, metrics=6, quarters=8),
+    'medium': ScalePoint('medium', insurers=200, lines=15, metrics=10, quarters=12),
+    'large': ScalePoint('large', insurers=500, lines=30, metrics=14, quarters=20),
+}
+
+
+def synthetic_lines(count: int) -> List[str]:
+    """Line names: the default selection first, then numbered lines."""
+    lines = list(DefaultValues.LINES)[:count]
+    lines.extend(f"линия {i}" for i in range(len(lines) + 1, count + 1))
+    return lines
+
+
+def synthetic_metrics(count: int) -> List[str]:
+    """Raw metrics always covering the benchmark metric selection."""
+    required = _raw_dependencies(BENCHMARK_METRICS)
+    rest = [m for m in RAW_METRICS if m not in required]
+    return (required + rest)[:max(count, len(required))]
+
+
+def synthetic_quarters(count: int, end_quarter: str = DefaultValues.END_QUARTER
+                       ) -> pd.DatetimeIndex:
+    """Quarter start dates ending at end_quarter, as in the raw files."""
+    end = pd.Period(end_quarter, freq='Q').start_time
+    return pd.date_range(end=end, periods=count, freq='QS')
+
+
+def generate_insurance_frame(scale: ScalePoint, seed: int = 0) -> pd.DataFrame:
+    """Frame shaped like a loaded 3rd_162_net.csv at the given scale.
+
+    Columns are year_quarter, metric, line, insurer and value. Insurers are
+    zero-padded four digit codes; the 'total' insurer holds the market sum
+    for every quarter, metric and line, like in the source data. Values
+    are log-normal so that ranks and market shares are well spread.
+    """
+    rng = np.random.default_rng(seed)
+    quarters = synthetic_quarters(scale.quarters)
+    metrics = synthetic_metrics(scale.metrics)
+    lines = synthetic_lines(scale.lines)
+    insurers = [f"{i:04d}" for i in range(1, scale.insurers + 1)]
+
+    # Reporting combinations are fixed per insurer/line/metric across quarters
+    combos = pd.MultiIndex.from_product(
+        [metrics, lines, insurers],
+        names=[Columns.METRIC, Columns.LINE, Columns.INSURER]).to_frame(index=False)
+    combos = combos[rng.random(len(combos)) < scale.density]
+    size = rng.lognormal(mean=0.0, sigma=1.5, size=len(combos))
+
+    frames = []
+    for quarter in quarters:
+        frame = combos.copy()
+        frame.insert(0, Columns.YEAR_QUARTER, quarter)
+        frame[Columns.VALUE] = size * rng.lognormal(0.0, 0.2, size=len(combos))
+        frames.append(frame)
+    df = pd.concat(frames, ignore_index=True)
+
+    totals = (df.groupby([Columns.YEAR_QUARTER, Columns.METRIC, Columns.LINE],
+                         as_index=False)[Columns.VALUE].sum()
+              .assign(**{Columns.INSURER: SpecialValues.TOTAL_INSURER}))
+    df = pd.concat([df, totals[df.columns]], ignore_index=True)
+    return df.sort_values(
+        [Columns.YEAR_QUARTER, Columns.METRIC, Columns.LINE, Columns.INSURER],
+        ignore_index=True)
+
+
+def _raw_dependencies(metrics: List[str]) -> List[str]:
+    """Raw metrics needed to compute the given metric selection."""
+    formulas = MetricsFormulas.get_default_formulas()
+    needed, stack = set(), list(metrics)
+    while stack:
+        metric = stack.pop()
+        if metric in needed or metric not in formulas:
+            continue
+        needed.add(metric)
+        dependencies, _ = formulas[metric]
+        stack.extend(dependencies)
+    return [m for m in RAW_METRICS if m in needed]
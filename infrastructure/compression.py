@@ -0,0 +1,94 @@
+# infrastructure/compression.py
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from flask import Flask, Response, request
+
+from infrastructure.metrics import metrics
+
+
+class ResponseCompression:
+    """Gzip compression for Dash callback and layout responses.
+
+    Responses are compressed only when the client accepts gzip and the body
+    is at least min_size bytes. Compressed bodies can be kept in a small
+    LRU cache keyed by path and body digest, so repeated responses (layout,
+    dependencies, re-sent callback outputs) are compressed once and served
+    from the stored bytes.
+    """
+
+    DEFAULT_PATHS = (
+        '/_dash-update-component',
+        '/_dash-layout',
+        '/_dash-dependencies',
+    )
+
+    def __init__(
+        self,
+        min_size: int = 1024,
+        level: int = 6,
+        cache_size: int = 64,
+        paths: Optional[Iterable[str]] = None
+    ):
+        self.min_size = min_size
+        self.level = level
+        self.cache_size = cache_size
+        self.paths = tuple(paths or self.DEFAULT_PATHS)
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, server: Flask, url_base_pathname: str = '/') -> None:
+        """Register the compression hook on the Flask server."""
+        prefix = url_base_pathname.rstrip('/')
+        self.paths = tuple(f"{prefix}{path}" for path in self.paths)
+        server.after_request(self.compress_response)
+
+    def compress_response(self, response: Response) -> Response:
+        """Gzip eligible responses in place."""
+        if (request.path not in self.paths
+                or response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if request.accept_encodings['gzip'] <= 0:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        response.set_data(self._compress(data))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Content-Length'] = str(response.content_length)
+        return response
+
+    def _compress(self, data: bytes) -> bytes:
+        """Compress data, reusing stored bytes for identical bodies."""
+        if self.cache_size <= 0:
+            return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+        key = (request.path, hashlib.blake2b(data, digest_size=16).digest())
+        with self._lock:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                metrics.record_cache('compression', True)
+                return compressed
+
+        compressed = gzip.compress(data, compresslevel=self.level, mtime=0)
+        with self._lock:
+            self.misses += 1
+            metrics.record_cache('compression', False)
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
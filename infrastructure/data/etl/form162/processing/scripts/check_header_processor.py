@@ -0,0 +1,249 @@
+# check_header_processor.py
+"""
+Regression and timing check of HeaderProcessor against the baseline
+HeaderProcessor, loaded with git show from the baseline commit.
+
+Run from the processing directory:
+
+    python scripts/check_header_processor.py
+    python scripts/check_header_processor.py --random 2000 --repeat 50
+    python scripts/check_header_processor.py --record ../scraping/csv_files
+
+fixtures/header_rows.json holds header blocks with the headers the
+baseline gives for them. The committed blocks are synthetic form-162
+style headers, since the scraped CSVs are not in the tree; --record
+replaces them with the blocks of real files. Fixtures and seeded random
+blocks must give the baseline's headers and intermediate rows. Exits
+with 1 on any mismatch.
+"""
+import argparse
+import json
+import logging
+import io
+import random
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from stage_1_processors import CSVProcessor, HeaderProcessor
+from stage_1_special_replacements import (
+    replacements1, replacements2, replacements3,
+    allowed_values_vertical, allowed_values_horizontal_agro,
+    allowed_values_horizontal_life
+)
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_PATH = Path('fixtures/header_rows.json')
+SCRIPTS_DIR = Path(__file__).resolve().parent
+BASELINE_REV = '5e0f94d'  # The commit before the header processing changes
+STEPS = ['apply_special_replacements', 'vertical_fill', 'horizontal_fill_agro',
+         'horizontal_fill_life']
+
+
+def load_baseline(rev: str) -> Any:
+    """
+    HeaderProcessor as committed in rev, loaded from git rather than copied.
+
+    Its header row logging goes through the logging module like any other,
+    so silence it with logging.disable when only the results matter.
+    """
+    source = subprocess.run(['git', 'show', f'{rev}:./stage_1_processors.py'],
+                            cwd=SCRIPTS_DIR, capture_output=True, text=True,
+                            check=True).stdout
+    module = types.ModuleType(f'stage_1_processors_{rev}')
+    exec(compile(source, f'{rev}:stage_1_processors.py', 'exec'), module.__dict__)
+    return module.HeaderProcessor
+
+
+def header_frame(rows: List[List[Any]]) -> pd.DataFrame:
+    """
+    Header rows followed by the 'ИТОГО' pattern row, as read_file returns them.
+    """
+    width = len(rows[0])
+    return pd.DataFrame([[np.nan if cell is None else cell for cell in row] for row in rows]
+                        + [['ИТОГО'] + [np.nan] * (width - 1)])
+
+
+def same_rows(left: List[List[Any]], right: List[List[Any]]) -> bool:
+    """Cell by cell equality, where NaN equals NaN and types must match."""
+    if len(left) != len(right):
+        return False
+    for left_row, right_row in zip(left, right):
+        if len(left_row) != len(right_row):
+            return False
+        for a, b in zip(left_row, right_row):
+            if pd.isna(a) and pd.isna(b):
+                continue
+            if type(a) is not type(b) or a != b:
+                return False
+    return True
+
+
+def check_fixtures(fixtures: List[Dict[str, Any]], baseline: Any) -> List[str]:
+    failures = []
+    for processor in (baseline(), HeaderProcessor()):
+        for fixture in fixtures:
+            df = header_frame(fixture['rows'])
+            header = processor.process_header_rows(df, len(fixture['rows']))
+            if header != fixture['header']:
+                failures.append(f"{fixture['name']} ({type(processor).__module__}): "
+                                f"got {header}, recorded {fixture['header']}")
+    return failures
+
+
+def random_rows(rng: random.Random, rows: int, columns: int) -> List[List[Any]]:
+    """Header rows mixing fill values, replacement pairs, blanks and NaN."""
+    values = (list(allowed_values_vertical) + list(allowed_values_horizontal_agro)
+              + list(allowed_values_horizontal_life) + list(replacements1)
+              + list(replacements2) + list(replacements3) + ['прочее', 'Всего'])
+
+    def cell():
+        roll = rng.random()
+        if roll < 0.35:
+            return np.nan
+        if roll < 0.45:
+            return rng.choice(['', '  '])
+        if roll < 0.5:
+            return rng.choice([1, 2.0, 3.5])
+        value = rng.choice(values)
+        return f' {value} ' if rng.random() < 0.2 else value
+
+    block = [[cell() for _ in range(columns)] for _ in range(rows)]
+    if columns >= 2 and rng.random() < 0.4:
+        # A pair with only blanks between them, which gets replaced
+        keys = list(rng.choice([replacements1, replacements3]))
+        row = block[rng.randrange(rows)]
+        start, end = sorted(rng.sample(range(columns), 2))
+        row[start], row[end] = rng.choice(keys), rng.choice(keys)
+        row[start + 1:end] = [rng.choice([np.nan, '']) for _ in range(end - start - 1)]
+    return block
+
+
+def check_random(cases: int, seed: int, baseline: Any) -> List[str]:
+    failures = []
+    rng = random.Random(seed)
+    reference, processor = baseline(), HeaderProcessor()
+    for case in range(cases):
+        rows = random_rows(rng, rng.randint(1, 6), rng.randint(1, 12))
+        df = header_frame(rows)
+        expected, actual = [list(row) for row in rows], [list(row) for row in rows]
+        for step in STEPS:
+            args = (df,) if step == 'horizontal_fill_life' else ()
+            expected = getattr(reference, step)(*args, expected)
+            actual = getattr(processor, step)(*args, actual)
+            if not same_rows(expected, actual):
+                failures.append(f"random case {case}, {step}: got {actual}, expected {expected}")
+                break
+        else:
+            if processor.combined_header(df, actual) != reference.combined_header(df, expected):
+                failures.append(f"random case {case}, combined_header: rows {rows}")
+            elif (processor.process_header_rows(df, len(rows))
+                  != reference.process_header_rows(df, len(rows))):
+                failures.append(f"random case {case}, process_header_rows: rows {rows}")
+    return failures
+
+
+def time_processors(fixtures: List[Dict[str, Any]], repeat: int, baseline: Any) -> None:
+    """
+    Mean time per header block of the baseline and current HeaderProcessor,
+    with logging off and with INFO logging to a stream as in stage_1.py.
+    """
+    frames = [(fixture['name'], header_frame(fixture['rows']), len(fixture['rows']))
+              for fixture in fixtures]
+    # The fixture blocks side by side, as wide as a full form
+    for width in (150, 400):
+        rows = [sum((fixture['rows'][i % len(fixture['rows'])] for fixture in fixtures), [])
+                for i in range(6)]
+        rows = [(row * (width // len(row) + 1))[:width] for row in rows]
+        frames.append((f'{len(rows)}x{width} tiled', header_frame(rows), len(rows)))
+
+    root = logging.getLogger()
+    handlers, level = root.handlers, root.level
+    for logged in (False, True):
+        print(f"\n{'INFO logging' if logged else 'logging off':<36}"
+              f"{'baseline':>12}{'current':>12}{'speedup':>10}")
+        logging.disable(logging.NOTSET if logged else logging.CRITICAL)
+        if logged:
+            # Only this stream, also for the baseline's root logger calls
+            root.handlers = [logging.StreamHandler(io.StringIO())]
+            root.setLevel(logging.INFO)
+        try:
+            for name, df, pattern_row_index in frames:
+                seconds = []
+                for processor in (baseline(), HeaderProcessor()):
+                    start = time.perf_counter()
+                    for _ in range(repeat):
+                        processor.process_header_rows(df, pattern_row_index)
+                    seconds.append((time.perf_counter() - start) / repeat)
+                print(f"{name:<36}{seconds[0] * 1000:>10.2f}ms{seconds[1] * 1000:>10.2f}ms"
+                      f"{seconds[0] / seconds[1]:>9.1f}x")
+        finally:
+            root.handlers = handlers
+            root.setLevel(level)
+            logging.disable(logging.CRITICAL)
+
+
+def record_fixtures(folder: Path, limit: Optional[int], baseline: Any) -> List[Dict[str, Any]]:
+    """Header blocks of the CSV files in folder and their baseline headers."""
+    csv_processor = CSVProcessor(exact_matches={}, header_replacements={},
+                                 value_replacements={})
+    reference = baseline()
+    fixtures = []
+    for filename in sorted(folder.glob('*.csv'))[:limit]:
+        df = csv_processor.read_file(filename)
+        _, pattern_row_index = csv_processor.find_pattern_row(df)
+        if not pattern_row_index:
+            continue
+        rows = df.iloc[:pattern_row_index].astype(object).where(
+            df.iloc[:pattern_row_index].notna(), None).values.tolist()
+        fixtures.append({
+            'name': filename.name,
+            'rows': rows,
+            'header': reference.process_header_rows(header_frame(rows), pattern_row_index)
+        })
+    return fixtures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Check HeaderProcessor against the baseline commit.')
+    parser.add_argument('--record', type=Path, metavar='CSV_DIR',
+                        help=f'rewrite {FIXTURES_PATH} from the header blocks of these CSV files')
+    parser.add_argument('--limit', type=int, help='record at most this many files')
+    parser.add_argument('--baseline', default=BASELINE_REV,
+                        help=f'commit to compare against (default: {BASELINE_REV})')
+    parser.add_argument('--random', type=int, default=1000, help='random blocks to compare')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=20, help='runs per block when timing')
+    args = parser.parse_args(argv)
+    logging.disable(logging.CRITICAL)
+    baseline = load_baseline(args.baseline)
+
+    if args.record:
+        fixtures = record_fixtures(args.record, args.limit, baseline)
+        FIXTURES_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(FIXTURES_PATH, 'w', encoding='utf-8') as f:
+            json.dump(fixtures, f, ensure_ascii=False, indent=1)
+        print(f"Recorded {len(fixtures)} header blocks to {FIXTURES_PATH}")
+
+    with open(FIXTURES_PATH, 'r', encoding='utf-8') as f:
+        fixtures = json.load(f)
+
+    failures = (check_fixtures(fixtures, baseline)
+                + check_random(args.random, args.seed, baseline))
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    print(f"{len(fixtures)} fixtures, {args.random} random blocks: {len(failures)} mismatches")
+
+    time_processors(fixtures, args.repeat, baseline)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
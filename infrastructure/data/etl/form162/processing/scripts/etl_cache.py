@@ -0,0 +1,133 @@
+# etl_cache.py
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Parquet when pyarrow is installed; pickle keeps dtypes exactly otherwise
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """
+    SHA-256 of a DataFrame's values, independent of its index.
+    """
+    digest = hashlib.sha256(','.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Short hash of JSON-serialisable settings, used in processor versions so
+    that changing a mapping invalidates the outputs built with it.
+    """
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+class CacheManifest:
+    """
+    Cached outputs keyed by input name, content hash and processor version.
+
+    The manifest is a JSON file in cache_dir mapping each key (a file name,
+    a quarter) to the hash of the input it was built from, the processor
+    version that built it and the cached frame. An entry is only reused
+    when both the hash and the version match. Inputs that gave no frame
+    get an entry without output, so they are not processed again either.
+    """
+
+    def __init__(self, cache_dir: Path, version: str):
+        self.cache_dir = Path(cache_dir)
+        self.version = version
+        self.path = self.cache_dir / 'manifest.json'
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as error:
+                logger.warning(f'Ignoring unreadable cache manifest {self.path}: {error}')
+
+    def lookup(self, key: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if (entry is None or entry['hash'] != content_hash
+                or entry['version'] != self.version
+                or (entry['output'] is not None
+                    and not (self.cache_dir / entry['output']).exists())):
+            return None
+        return entry
+
+    def load_frame(self, entry: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        if entry['output'] is None:
+            return None
+        path = self.cache_dir / entry['output']
+        if path.suffix == '.parquet':
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+    def store(self, key: str, content_hash: str, df: Optional[pd.DataFrame],
+              **extra: Any) -> None:
+        """
+        Cache df for key, or record that the input gave no frame if df is None.
+        """
+        output = None
+        if df is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            stem = ''.join(c if c.isalnum() or c in '-_' else '_' for c in key)
+            output = f'{stem}-{content_hash[:12]}.{CACHE_FORMAT}'
+            df = df.reset_index(drop=True)
+            if CACHE_FORMAT == 'parquet':
+                df.to_parquet(self.cache_dir / output, index=False)
+            else:
+                df.to_pickle(self.cache_dir / output)
+
+        previous = self.entries.get(key)
+        if previous and previous['output'] != output:
+            self._remove_output(previous['output'])
+        self.entries[key] = {'hash': content_hash, 'version': self.version,
+                             'output': output, **extra}
+
+    def prune(self, keys: Iterable[str]) -> None:
+        """
+        Drop entries (and their files) whose input no longer exists.
+        """
+        keep = set(keys)
+        for key in [k for k in self.entries if k not in keep]:
+            self._remove_output(self.entries.pop(key)['output'])
+
+    def save(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _remove_output(self, output: Optional[str]) -> None:
+        if output is None:
+            return
+        try:
+            (self.cache_dir / output).unlink()
+        except FileNotFoundError:
+            pass
@@ -4,7 +4,7 @@ import re
 import os
 
 from pathlib import Path
-from typing import Dict, List, Any, TypedDict
+from typing import Dict, List, Any, Optional, TypedDict
 
 
 logger = logging.getLogger(__name__)
@@ -103,6 +103,8 @@ class Config(TypedDict):
     value_replacements: Dict[str, str]
     header_replacements: Dict[str, str]
     insurance_lines_mapping: Dict[str, str]
+    max_workers: Optional[int]
+    cache_dir: Optional[Path]
 
 
 # Load all JSON files first
@@ -120,7 +122,9 @@ config = Config(
     datatype_mapping=load_json_file('mapping/datatype_mapping.json'),
     value_replacements=value_replacements,
     header_replacements=header_replacements,
-    insurance_lines_mapping=insurance_lines_mapping
+    insurance_lines_mapping=insurance_lines_mapping,
+    max_workers=None,  # Processes for per-file work; None uses all cores, 1 none
+    cache_dir=Path('intermediate_data/cache/stage_1')  # None re-parses every file
 )
 
 
@@ -136,5 +140,7 @@ def get_config() -> Dict[str, Any]:
         'datatype_mapping': config['datatype_mapping'],
         'value_replacements': config['value_replacements'],
         'header_replacements': config['header_replacements'],
-        'insurance_lines_mapping': config['insurance_lines_mapping']
+        'insurance_lines_mapping': config['insurance_lines_mapping'],
+        'max_workers': config['max_workers'],
+        'cache_dir': config['cache_dir']
     }
\ No newline at end of file
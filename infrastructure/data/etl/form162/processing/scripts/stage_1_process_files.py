@@ -1,34 +1,65 @@
 # process_files.
+import os
 import re
 import logging
+import time
 import pandas as pd
-from typing import List, Any
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 from tqdm import tqdm
+from etl_cache import CacheManifest, file_hash, fingerprint
 from stage_1_config import Config
 from stage_1_processors import CSVProcessor
-from stage_1_utils import log_unmapped_lines, is_file_within_criteria
+from stage_1_utils import (
+    count_unmapped_lines, is_file_within_criteria, log_unmapped_lines, log_unmapped_summary
+)
 
 logger = logging.getLogger(__name__)
 
+GROUP_COLUMNS = ['insurer', 'year', 'quarter', 'datatype', 'insurance_line']
 
-def combine_and_clean_data(all_data: List[pd.DataFrame], config: Config) -> pd.DataFrame:
+# Bump when a change to file processing alters its output, so cached
+# per-file results are rebuilt
+PROCESSOR_VERSION = 1
 
-    logger.info("Starting combine_and_clean_data function")
+# (cleaned frame or None, unmapped line counts, timings) of one file
+FileResult = Tuple[Optional[pd.DataFrame], Dict[str, int], Dict[str, float]]
+
+# Per-process state of the worker pool, set by _init_worker
+_worker_processor: Optional[CSVProcessor] = None
+_worker_config: Optional[Config] = None
+
+
+def clean_file_data(df: pd.DataFrame, config: Config) -> pd.DataFrame:
+    """
+    Clean the long-format data of one file and sum it per output key.
+
+    Every step is row-wise, so cleaning files one by one and summing
+    their results again after concatenation gives the same output as
+    cleaning the concatenation, while only the much smaller per-file
+    sums are kept in memory.
+    """
+    df = df.reindex(columns=['insurer', 'year', 'quarter',
+                             'datatype', 'insurance_line', 'value'])
+
+    df['value'] = pd.to_numeric(df['value'], errors='coerce')
+    df['quarter'] = pd.to_numeric(df['quarter'], errors='coerce')
+    df['year'] = pd.to_numeric(df['year'], errors='coerce')
+    df = df.dropna(subset=['value'])
+    df['insurer'] = df['insurer'].apply(format_insurer_code)
 
-    final_df = pd.concat(all_data, ignore_index=True)
+    df['insurance_line'] = df['insurance_line'].map(config['insurance_lines_mapping'])
 
-    final_df = final_df.reindex(columns=['insurer', 'year', 'quarter',
-                                         'datatype', 'insurance_line', 'value'])
+    return df.groupby(GROUP_COLUMNS)['value'].sum().reset_index()
 
-    final_df['value'] = pd.to_numeric(final_df['value'], errors='coerce')
-    final_df['quarter'] = pd.to_numeric(final_df['quarter'], errors='coerce')
-    final_df['year'] = pd.to_numeric(final_df['year'], errors='coerce')
-    final_df = final_df.dropna(subset=['value'])
-    final_df['insurer'] = final_df['insurer'].apply(format_insurer_code)
 
-    log_unmapped_lines(final_df, config['insurance_lines_mapping'])
+def combine_and_clean_data(cleaned_data: List[pd.DataFrame]) -> pd.DataFrame:
 
-    final_df['insurance_line'] = final_df['insurance_line'].map(config['insurance_lines_mapping'])
+    logger.info("Starting combine_and_clean_data function")
+
+    final_df = pd.concat(cleaned_data, ignore_index=True)
     logger.debug(f"Unique values in 'insurance_line' after mapping: {final_df['insurance_line'].unique()}")
 
     if 'insurer' in final_df['insurance_line'].values:
@@ -39,9 +70,7 @@ def combine_and_clean_data(all_data: List[pd.DataFrame], config: Config) -> pd.D
     logger.info("Finished combine_and_clean_data function")
 
     final_df = (
-        final_df.groupby(
-            ['insurer', 'year', 'quarter', 'datatype', 'insurance_line']
-        )
+        final_df.groupby(GROUP_COLUMNS)
         ['value']
         .sum()
         .reset_index()
@@ -67,51 +96,199 @@ def format_insurer_code(code: Any) -> str:
         return str(code)
 
 
-def process_files(config: Config) -> pd.DataFrame:
-    all_data = []
-
-    csv_processor = CSVProcessor(
+def create_csv_processor(config: Config) -> CSVProcessor:
+    return CSVProcessor(
         exact_matches={'всего': 'all_lines'},
         header_replacements=config['header_replacements'],
         value_replacements=config['value_replacements']
     )
 
-    csv_files = list(config['folder_path'].glob('*.csv'))
+
+def process_single_file(filename: Path, csv_processor: CSVProcessor,
+                        config: Config) -> FileResult:
+    """
+    Read, reconstruct headers, check line mapping and clean one file.
+
+    Returns:
+        FileResult: Cleaned data (None if nothing was processed), counts of
+        unmapped insurance lines and seconds spent per step.
+    """
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    df = csv_processor.read_file(filename)
+    timings['read'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df_processed = csv_processor.process_file(df, filename, config)
+    timings['process'] = time.perf_counter() - start
+    if df_processed is None:
+        return None, {}, timings
+
+    start = time.perf_counter()
+    # Log unmapped lines for each file individually
+    log_unmapped_lines(df_processed, config['insurance_lines_mapping'], filename.name)
+    unmapped = count_unmapped_lines(df_processed, config['insurance_lines_mapping'])
+    cleaned = clean_file_data(df_processed, config)
+    timings['clean'] = time.perf_counter() - start
+    return cleaned, unmapped, timings
+
+
+def _init_worker(config: Config, log_level: int) -> None:
+    global _worker_processor, _worker_config
+    root = logging.getLogger()
+    if not root.handlers:  # Spawned workers do not inherit the handlers
+        logging.basicConfig(
+            level=log_level,
+            format='%(asctime)s - %(levelname)s - [%(funcName)s] - %(message)s')
+    root.setLevel(log_level)
+    _worker_processor = create_csv_processor(config)
+    _worker_config = config
+
+
+def _process_in_worker(filename: Path) -> FileResult:
+    return process_single_file(filename, _worker_processor, _worker_config)
+
+
+def iter_file_results(files: List[Path], config: Config) -> Iterator[FileResult]:
+    """
+    Process files and yield their results in the order of files.
+
+    With more than one worker, files run in a process pool. At most two
+    files per worker are in flight, so finished results that are waiting
+    for an earlier, slower file do not pile up in memory.
+    """
+    max_workers = config.get('max_workers') or os.cpu_count() or 1
+    if max_workers == 1 or len(files) <= 1:
+        csv_processor = create_csv_processor(config)
+        for filename in files:
+            yield process_single_file(filename, csv_processor, config)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(config, logging.getLogger().level)) as executor:
+        window = 2 * max_workers
+        pending: Deque[Future] = deque()
+        remaining = iter(files)
+        for filename in remaining:
+            pending.append(executor.submit(_process_in_worker, filename))
+            if len(pending) >= window:
+                break
+        while pending:
+            result = pending.popleft().result()
+            next_file = next(remaining, None)
+            if next_file is not None:
+                pending.append(executor.submit(_process_in_worker, next_file))
+            yield result
+
+
+def processor_version(config: Config) -> str:
+    """
+    Version of per-file results: the code version plus the mappings used.
+    """
+    return f"{PROCESSOR_VERSION}-" + fingerprint(
+        config['datatype_mapping'], config['value_replacements'],
+        config['header_replacements'], config['insurance_lines_mapping'])
+
+
+def iter_cached_results(files: List[Path], config: Config) -> Iterator[FileResult]:
+    """
+    Yield results of files in order, re-parsing only new or changed files.
+
+    Unchanged files (same content hash and processor version) are read
+    from the cache; the others are processed by iter_file_results and
+    their results, including files that gave no data, are cached for the
+    next run. The manifest is saved even if processing stops partway, so
+    the files done so far are not parsed again.
+    """
+    manifest = CacheManifest(config['cache_dir'], processor_version(config))
+    hashes = {filename: file_hash(filename) for filename in files}
+    entries = {filename: manifest.lookup(filename.name, hashes[filename])
+               for filename in files}
+    changed = [filename for filename in files if entries[filename] is None]
+    logger.info(f'{len(files) - len(changed)} files unchanged since the last run, '
+                f'{len(changed)} to parse')
+
+    parsed = iter_file_results(changed, config)
+    try:
+        for filename in files:
+            entry = entries[filename]
+            if entry is not None:
+                start = time.perf_counter()
+                df_cleaned = manifest.load_frame(entry)
+                yield df_cleaned, entry['unmapped'], {'cache': time.perf_counter() - start}
+                continue
+            df_cleaned, unmapped, timings = next(parsed)
+            manifest.store(filename.name, hashes[filename], df_cleaned, unmapped=unmapped)
+            yield df_cleaned, unmapped, timings
+    finally:
+        manifest.prune(filename.name for filename in files)
+        manifest.save()
+
+
+def process_files(config: Config) -> pd.DataFrame:
+    all_data = []
+    unmapped_counts: Counter = Counter()
+    file_timings: List[Tuple[str, Dict[str, float]]] = []
+
+    # Sorted so that results and logs come in the same order on every run
+    csv_files = sorted(config['folder_path'].glob('*.csv'))
     total_files = len(csv_files)
-    processed_files = 0
+    files_to_process = []
     skipped_files = 0
 
-    for filename in tqdm(csv_files, desc='Processing files'):
-        logger.info(f"Processing file: {filename}")
+    for filename in csv_files:
         if is_file_within_criteria(filename.name, config['year_threshold'],
                                    config['quarter_threshold']):
-            df = csv_processor.read_file(filename)
-            df_processed = csv_processor.process_file(df, filename, config)
-            if df_processed is not None:
-                # Log unmapped lines for each file individually
-                log_unmapped_lines(df_processed,
-                                   config['insurance_lines_mapping'],
-                                   filename.name)
-                all_data.append(df_processed)
-                processed_files += 1
-            else:
-                logger.warning(f'No data processed for file: {filename}')
+            files_to_process.append(filename)
         else:
             skipped_files += 1
             logger.info(f"Skipped file: {filename}")
 
+    start = time.perf_counter()
+    results = (iter_cached_results(files_to_process, config) if config.get('cache_dir')
+               else iter_file_results(files_to_process, config))
+    # results first: zip then exhausts it, which lets it save the cache manifest
+    for (df_cleaned, unmapped, timings), filename in tqdm(
+            zip(results, files_to_process), total=len(files_to_process),
+            desc='Processing files'):
+        file_timings.append((filename.name, timings))
+        logger.info(f"Processed file: {filename} "
+                    + ', '.join(f'{step} {seconds:.2f}s' for step, seconds in timings.items()))
+        if df_cleaned is not None:
+            all_data.append(df_cleaned)
+            unmapped_counts.update(unmapped)
+        else:
+            logger.warning(f'No data processed for file: {filename}')
+    elapsed = time.perf_counter() - start
+    processed_files = len(all_data)
+
     logger.info(f'Total files found: {total_files}')
     logger.info(f'Files processed: {processed_files}')
     logger.info(f'Files skipped (did not meet criteria): {skipped_files}')
     logger.info(f'Files with no data: {total_files - processed_files - skipped_files}')
+    log_file_timings(file_timings, elapsed)
 
     if not all_data:
         raise ValueError('No data was processed from any file.')
 
-    final_df = combine_and_clean_data(all_data, config)
+    final_df = combine_and_clean_data(all_data)
 
     # Log final summary of all unmapped lines across all files
     logger.info("Final summary of unmapped lines across all files:")
-    log_unmapped_lines(pd.concat(all_data, ignore_index=True), config['insurance_lines_mapping'])
+    log_unmapped_summary(unmapped_counts)
+
+    return final_df
+
 
-    return final_df
\ No newline at end of file
+def log_file_timings(file_timings: List[Tuple[str, Dict[str, float]]],
+                     elapsed: float, slowest: int = 5) -> None:
+    """Log summed per-step times and the slowest files."""
+    totals: Counter = Counter()
+    for _, timings in file_timings:
+        totals.update(timings)
+    logger.info(f"Processed {len(file_timings)} files in {elapsed:.2f}s wall time; "
+                + ', '.join(f'{step} {seconds:.2f}s' for step, seconds in totals.items())
+                + ' summed over files')
+    by_time = sorted(file_timings, key=lambda item: sum(item[1].values()), reverse=True)
+    for name, timings in by_time[:slowest]:
+        logger.info(f"Slow file: {name} {sum(timings.values()):.2f}s")
@@ -14,6 +14,10 @@ from stage_1_special_replacements import (
 
 logger = logging.getLogger(__name__)
 
+_ALLOWED_VERTICAL = frozenset(allowed_values_vertical)
+_ALLOWED_HORIZONTAL_AGRO = frozenset(allowed_values_horizontal_agro)
+_ALLOWED_HORIZONTAL_LIFE = frozenset(allowed_values_horizontal_life)
+
 
 class FileProcessor(ABC):
     @abstractmethod
@@ -31,21 +35,29 @@ class FileProcessor(ABC):
 
 
 class HeaderProcessor:
+    """
+    Rebuilds column headers from the header rows above the 'ИТОГО' row.
+
+    Header rows are only logged at DEBUG, and only when that level is
+    enabled; allowed values are looked up in sets.
+    """
+
     def process_header_rows(self, dataframe: pd.DataFrame, pattern_row_index: int) -> List[str]:
         header_rows = dataframe.iloc[:pattern_row_index].values.tolist()
-        logger.critical(f"Original header rows: {header_rows}")
+        if not header_rows:
+            raise ValueError('No header rows above the pattern row')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Original header rows: {header_rows}")
 
         header_rows = self.apply_special_replacements(header_rows)
 
-        logger.critical(f" header rows afre special replacements: {header_rows}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Header rows after special replacements: {header_rows}")
 
         header_rows = self.vertical_fill(header_rows)
         header_rows = self.horizontal_fill_agro(header_rows)
         header_rows = self.horizontal_fill_life(dataframe, header_rows)
-        combined_header = self.combined_header(dataframe, header_rows)
-        #logger.critical(f" combined header: {combined_header}")
-
-        return combined_header
+        return self.combined_header(dataframe, header_rows)
 
     def apply_special_replacements(self, header_rows: List[List[str]]) -> List[List[str]]:
         def replace_pair(row, start, end, replacements):
@@ -89,7 +101,7 @@ class HeaderProcessor:
                         header_rows[i][j] = last_valid_value
                 else:
                     cell_value = str(cell).strip()
-                    if cell_value in allowed_values_vertical:
+                    if cell_value in _ALLOWED_VERTICAL:
                         last_valid_value = cell_value
                     else:
                         last_valid_value = None
@@ -108,7 +120,7 @@ class HeaderProcessor:
                         header_rows[i][j] = last_valid_value_horizontal_agro
                 else:
                     cell_value = str(cell).strip()
-                    if cell_value in allowed_values_horizontal_agro:
+                    if cell_value in _ALLOWED_HORIZONTAL_AGRO:
                         last_valid_value_horizontal_agro = cell_value
                     else:
                         last_valid_value_horizontal_agro = None
@@ -126,7 +138,7 @@ class HeaderProcessor:
             for j, cell in enumerate(row):
                 if pd.notna(cell):
                     cell_value = str(cell).strip()
-                    if cell_value in allowed_values_horizontal_life:
+                    if cell_value in _ALLOWED_HORIZONTAL_LIFE:
                         last_allowed_index = j
                         row_max_fill_index = j
                     elif last_allowed_index != -1:
@@ -137,7 +149,7 @@ class HeaderProcessor:
 
             if last_allowed_index != -1:
                 max_fill_index = row_max_fill_index
-                logging.warning(f"Max fill index set to {max_fill_index} based on row {i + 1}")
+                logger.debug(f"Max fill index set to {max_fill_index} based on row {i + 1}")
                 break
 
         if max_fill_index == -1:
@@ -155,11 +167,11 @@ class HeaderProcessor:
                             row[j] = last_valid_value
                 else:
                     cell_value = str(cell).strip()
-                    if cell_value in allowed_values_horizontal_life:
+                    if cell_value in _ALLOWED_HORIZONTAL_LIFE:
                         last_valid_value = cell_value
                     else:
                         last_valid_value = None
-        logging.info(f"Max fill index: {max_fill_index}")
+        logger.debug(f"Max fill index: {max_fill_index}")
 
         return header_rows
 
@@ -1,7 +1,7 @@
 import logging
 import re
 
-from typing import Dict
+from typing import Dict, Mapping
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -70,4 +70,34 @@ def log_unmapped_lines(df: pd.DataFrame, mapping: Dict[str, str], filename: str
             logger.debug(f"Insurers: {sorted(formatted_insurers)}")
     else:
         source_info = f" for {filename}" if filename else ""
-        logger.info(f'All insurance lines were successfully mapped{source_info}.')
\ No newline at end of file
+        logger.info(f'All insurance lines were successfully mapped{source_info}.')
+
+
+def count_unmapped_lines(df: pd.DataFrame, mapping: Dict[str, str]) -> Dict[str, int]:
+    """
+    Count rows per insurance line that has no mapping.
+
+    Args:
+        df (pd.DataFrame): The DataFrame containing insurance lines
+        mapping (Dict[str, str]): Mapping dictionary for insurance lines
+
+    Returns:
+        Dict[str, int]: Row count of every unmapped line
+    """
+    counts = df['insurance_line'].value_counts(dropna=False)
+    return {line: int(count) for line, count in counts.items() if line not in mapping}
+
+
+def log_unmapped_summary(counts: Mapping[str, int]) -> None:
+    """
+    Log unmapped insurance lines summed over all files.
+
+    Args:
+        counts (Mapping[str, int]): Row count of every unmapped line
+    """
+    if counts:
+        formatted_list = '\n'.join(f"'{line}' (count: {count})"
+                                   for line, count in counts.items())
+        logger.critical(f'Unmapped insurance lines:\n{formatted_list}')
+    else:
+        logger.info('All insurance lines were successfully mapped.')
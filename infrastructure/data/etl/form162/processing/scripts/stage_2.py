@@ -1,5 +1,8 @@
 import pandas as pd
 import logging
+from pathlib import Path
+from typing import Dict, List
+from etl_cache import CacheManifest, fingerprint, frame_hash
 from stage_2_line_maps import lines_custom_just_aggregate, lines_custom_just_exclude, lines_custom_aggregate_and_drop
 
 # Configure logging with more detailed format
@@ -13,54 +16,13 @@ logging.basicConfig(
 )
 
 file_path = 'intermediate_data/1st_162_net.csv'
-# Load data with logging
-logging.info("Starting data processing")
-df = pd.read_csv(file_path)
-# Date conversion
-logging.info("Converting dates")
-df['year_quarter'] = pd.to_datetime(df['year'].astype(str) + '-' +
-                                    ((df['quarter'] - 1) * 3 + 1).astype(str) + '-01')
-df = df.drop(columns=['year', 'quarter'])
-df = df.rename(columns={'insurance_line': 'line', 'datatype': 'metric'})
-df = df.replace({'insurer': {'all_insurers': 'total'}})
-mask = (df['insurer'] == 'total') & (df['line'] == '5') & (
-    df['year_quarter'] >= pd.Timestamp('2021-10-01'))
-df = pd.concat([df, df[mask].assign(insurer='0000')], ignore_index=True)
-
-df = df[(df['value'] != 0) & (df['value'].notna())]
-df = df[(df['year_quarter'] <= pd.Timestamp('2025-01-01'))]
-df = df[(df['year_quarter'] >= pd.Timestamp('2019-01-01'))]
-
-df['value'] = df['value'] / 1_000_000
-
-line_group_cols = [col for col in df.columns if col not in ['line', 'value']]
-new_rows = []
-lines_to_remove = []  # Keep track of all lines that will be aggregated
-logging.info(f"lines unique: {df['line'].unique() }")
-
-for new_line, line_list in lines_custom_aggregate_and_drop.items():
-    filtered_df = df[df['line'].isin(line_list)]
-    aggregated = filtered_df.groupby(line_group_cols,
-                                     as_index=False)['value'].sum()
-    aggregated['line'] = new_line
-    new_rows.append(aggregated)
-    lines_to_remove.extend(line_list)
-logging.info(f"lines_to_remove{lines_to_remove}")
-
-for new_line, line_list in lines_custom_just_aggregate.items():
-    filtered_df = df[df['line'].isin(line_list)]
-    aggregated = filtered_df.groupby(line_group_cols,
-                                     as_index=False)['value'].sum()
-    aggregated['line'] = new_line
-    new_rows.append(aggregated)
-logging.info(f"lines_custom_just_exclude{lines_custom_just_exclude}")
-lines_to_remove.extend(lines_custom_just_exclude)
-logging.info(f"lines_to_remove{lines_to_remove}")
-
-filtered_df = df[~df['line'].isin(lines_to_remove)]
-
-df = pd.concat([filtered_df] + new_rows, ignore_index=True)
-logging.info(f"lines unique: {df['line'].unique() }")
+output_path = 'intermediate_data/3rd_162_net.csv'
+# Per-quarter results; None recomputes every quarter
+cache_dir = Path('intermediate_data/cache/stage_2')
+
+# Bump when a change to transform() alters its output, so cached quarters
+# are rebuilt
+STAGE_2_VERSION = 1
 
 metric_mapping = {
     'premiums_interm_total': 'premiums_interm',
@@ -70,11 +32,113 @@ metric_mapping = {
     'commissions_nonelec': 'commissions_interm',
     'commissions_electronic': 'commissions_interm'
 }
-df = df.copy()
-df.loc[df['metric'].isin(
-    metric_mapping.keys()), 'metric'] = df.loc[df['metric'].isin(
-        metric_mapping.keys()), 'metric'].map(metric_mapping)
-metric_group_cols = [col for col in df.columns if col != 'value']
-df_new = df.groupby(metric_group_cols, as_index=False)['value'].sum()
-
-df_new.to_csv('intermediate_data/3rd_162_net.csv', index=False)
\ No newline at end of file
+
+
+def transform(df: pd.DataFrame) -> pd.DataFrame:
+    """Turn 1st stage rows into the app's lines and metrics.
+
+    Every step works within a quarter (filters, and groupings that include
+    year_quarter), so quarters can be transformed independently.
+    """
+    # Date conversion
+    logging.info("Converting dates")
+    df['year_quarter'] = pd.to_datetime(df['year'].astype(str) + '-' +
+                                        ((df['quarter'] - 1) * 3 + 1).astype(str) + '-01')
+    df = df.drop(columns=['year', 'quarter'])
+    df = df.rename(columns={'insurance_line': 'line', 'datatype': 'metric'})
+    df = df.replace({'insurer': {'all_insurers': 'total'}})
+    mask = (df['insurer'] == 'total') & (df['line'] == '5') & (
+        df['year_quarter'] >= pd.Timestamp('2021-10-01'))
+    df = pd.concat([df, df[mask].assign(insurer='0000')], ignore_index=True)
+
+    df = df[(df['value'] != 0) & (df['value'].notna())]
+    df = df[(df['year_quarter'] <= pd.Timestamp('2025-01-01'))]
+    df = df[(df['year_quarter'] >= pd.Timestamp('2019-01-01'))]
+
+    df['value'] = df['value'] / 1_000_000
+
+    line_group_cols = [col for col in df.columns if col not in ['line', 'value']]
+    new_rows = []
+    lines_to_remove = []  # Keep track of all lines that will be aggregated
+    logging.info(f"lines unique: {df['line'].unique() }")
+
+    for new_line, line_list in lines_custom_aggregate_and_drop.items():
+        filtered_df = df[df['line'].isin(line_list)]
+        aggregated = filtered_df.groupby(line_group_cols,
+                                         as_index=False)['value'].sum()
+        aggregated['line'] = new_line
+        new_rows.append(aggregated)
+        lines_to_remove.extend(line_list)
+    logging.info(f"lines_to_remove{lines_to_remove}")
+
+    for new_line, line_list in lines_custom_just_aggregate.items():
+        filtered_df = df[df['line'].isin(line_list)]
+        aggregated = filtered_df.groupby(line_group_cols,
+                                         as_index=False)['value'].sum()
+        aggregated['line'] = new_line
+        new_rows.append(aggregated)
+    logging.info(f"lines_custom_just_exclude{lines_custom_just_exclude}")
+    lines_to_remove.extend(lines_custom_just_exclude)
+    logging.info(f"lines_to_remove{lines_to_remove}")
+
+    filtered_df = df[~df['line'].isin(lines_to_remove)]
+
+    df = pd.concat([filtered_df] + new_rows, ignore_index=True)
+    logging.info(f"lines unique: {df['line'].unique() }")
+
+    df = df.copy()
+    df.loc[df['metric'].isin(
+        metric_mapping.keys()), 'metric'] = df.loc[df['metric'].isin(
+            metric_mapping.keys()), 'metric'].map(metric_mapping)
+    metric_group_cols = [col for col in df.columns if col != 'value']
+    return df.groupby(metric_group_cols, as_index=False)['value'].sum()
+
+
+def transform_incremental(df: pd.DataFrame, cache_dir: Path) -> pd.DataFrame:
+    """transform() recomputing only quarters whose input rows changed.
+
+    Results are cached per quarter, keyed by a hash of the quarter's input
+    rows and the stage version (including the line and metric maps).
+    """
+    version = f"{STAGE_2_VERSION}-" + fingerprint(
+        lines_custom_aggregate_and_drop, lines_custom_just_aggregate,
+        lines_custom_just_exclude, metric_mapping)
+    manifest = CacheManifest(cache_dir, version)
+
+    quarters: Dict[str, pd.DataFrame] = {
+        f'{int(year)}Q{int(quarter)}': part
+        for (year, quarter), part in df.groupby(['year', 'quarter'], sort=True)
+    }
+    hashes = {key: frame_hash(part) for key, part in quarters.items()}
+    entries = {key: manifest.lookup(key, hashes[key]) for key in quarters}
+    changed = [key for key in quarters if entries[key] is None]
+    logging.info(f"{len(quarters) - len(changed)} quarters unchanged, "
+                 f"recomputing {changed}")
+
+    results: List[pd.DataFrame] = []
+    if changed:
+        fresh = transform(pd.concat([quarters[key] for key in changed]))
+        by_quarter = dict(tuple(fresh.groupby(fresh['year_quarter'].dt.to_period('Q'))))
+        for key in changed:
+            part = by_quarter.get(pd.Period(key, freq='Q'), fresh.iloc[:0])
+            manifest.store(key, hashes[key], part)
+            results.append(part)
+    results.extend(manifest.load_frame(entries[key]) for key in quarters
+                   if entries[key] is not None)
+    manifest.prune(quarters)
+    manifest.save()
+
+    # Same row order as transform() on all quarters, whose final groupby
+    # sorts by every column but value
+    df_new = pd.concat(results, ignore_index=True)
+    group_cols = [col for col in df_new.columns if col != 'value']
+    return df_new.sort_values(group_cols, kind='stable', ignore_index=True)
+
+
+if __name__ == '__main__':
+    # Load data with logging
+    logging.info("Starting data processing")
+    df = pd.read_csv(file_path)
+    df_new = (transform_incremental(df, cache_dir) if cache_dir is not None
+              else transform(df))
+    df_new.to_csv(output_path, index=False)
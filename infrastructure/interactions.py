@@ -0,0 +1,217 @@
+# infrastructure/interactions.py
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import Flask, Response, abort, g, has_request_context, jsonify, request
+
+
+class InteractionTracker:
+    """Groups chained Dash callback requests into interactions.
+
+    A callback request that is not triggered by the output of an earlier
+    request from the same browser starts a new interaction with a fresh
+    correlation id. Requests triggered by a tracked output (for example
+    process-data-one-trigger.data) inherit the id of the request that
+    wrote it, so the id follows the chain of stores without changing their
+    data. Browsers are told apart by a cookie.
+
+    Every step records request handling time, callback compute time and
+    the gap since its parent response, i.e. network round trip, browser
+    work and queueing. Chain state is kept for the max_sessions most
+    recently active browsers.
+    """
+
+    COOKIE = 'dash_interaction_sid'
+
+    def __init__(self, max_interactions: int = 50, timeout: float = 30.0,
+                 max_sessions: int = 32):
+        self.max_interactions = max_interactions
+        self.timeout = timeout
+        self.max_sessions = max_sessions
+        self._interactions: OrderedDict = OrderedDict()
+        # session id -> prop id -> (interaction id, step index, response end),
+        # least recently active session first
+        self._outputs: OrderedDict[str, Dict[str, Tuple[str, int, float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, server: Flask, url_base_pathname: str = '/',
+                 path: str = '/admin/interactions',
+                 local_only: bool = True) -> None:
+        """Hook callback requests and register the JSON export routes."""
+        update_path = f"{url_base_pathname.rstrip('/')}/_dash-update-component"
+
+        @server.before_request
+        def start_step() -> None:
+            if request.path == update_path and request.method == 'POST':
+                self._start_step()
+
+        @server.after_request
+        def finish_step(response: Response) -> Response:
+            if getattr(g, 'interaction_step', None) is not None:
+                self._finish_step(response)
+            return response
+
+        def check_access() -> None:
+            if local_only and request.remote_addr not in ('127.0.0.1', '::1'):
+                abort(404)
+
+        def list_interactions() -> Response:
+            check_access()
+            return jsonify(self.export())
+
+        def get_interaction(interaction_id: str) -> Response:
+            check_access()
+            interaction = self.export(interaction_id)
+            if interaction is None:
+                abort(404)
+            return jsonify(interaction)
+
+        server.add_url_rule(path, 'list_interactions', list_interactions)
+        server.add_url_rule(f"{path}/<interaction_id>", 'get_interaction',
+                            get_interaction)
+
+    def mark_callback(self, name: str, start: float, end: float) -> None:
+        """Attach callback name and compute time (perf_counter) to the step."""
+        if has_request_context() and getattr(g, 'interaction_step', None) is not None:
+            g.interaction_step.update(
+                callback=name,
+                callback_start=start,
+                callback_end=end)
+
+    def _start_step(self) -> None:
+        now = time.perf_counter()
+        payload = request.get_json(silent=True) or {}
+        session_id = request.cookies.get(self.COOKIE) or uuid.uuid4().hex
+        triggers = list(payload.get('changedPropIds') or [])
+
+        with self._lock:
+            outputs = self._outputs.get(session_id, {})
+            parent = next(
+                (outputs[prop] for prop in triggers
+                 if prop in outputs and now - outputs[prop][2] <= self.timeout),
+                None)
+            if parent is None:
+                interaction_id = uuid.uuid4().hex[:12]
+                self._interactions[interaction_id] = {
+                    'id': interaction_id,
+                    'session': session_id,
+                    'started_at': time.time(),
+                    'origin': triggers[0] if triggers else 'initial_load',
+                    'start': now,
+                    'steps': []
+                }
+                while len(self._interactions) > self.max_interactions:
+                    self._interactions.popitem(last=False)
+                parent_step, gap_start = None, None
+            else:
+                interaction_id, parent_step, gap_start = parent
+
+        g.interaction_step = {
+            'interaction': interaction_id,
+            'session': session_id,
+            'new_session': self.COOKIE not in request.cookies,
+            'callback': None,
+            'trigger': triggers,
+            'outputs': list(self._prop_ids(payload.get('outputs'))),
+            'parent': parent_step,
+            'request_start': now,
+            'gap_start': gap_start,
+        }
+
+    def _finish_step(self, response: Response) -> None:
+        step = g.interaction_step
+        g.interaction_step = None
+        end = time.perf_counter()
+        step['response_end'] = end
+        if step['new_session']:
+            response.set_cookie(self.COOKIE, step['session'], httponly=True,
+                                samesite='Lax')
+
+        with self._lock:
+            interaction = self._interactions.get(step['interaction'])
+            if interaction is None:
+                return
+            index = len(interaction['steps'])
+            interaction['steps'].append(step)
+            # Outputs of this step chain later requests into the interaction
+            outputs = self._outputs.get(step['session'])
+            if outputs is None:
+                outputs = self._outputs[step['session']] = {}
+            self._outputs.move_to_end(step['session'])
+            while len(self._outputs) > self.max_sessions:
+                self._outputs.popitem(last=False)
+            for prop in step['outputs']:
+                outputs[prop] = (step['interaction'], index, end)
+            if len(outputs) > 1000:
+                cutoff = end - self.timeout
+                for prop in [p for p, v in outputs.items() if v[2] < cutoff]:
+                    del outputs[prop]
+
+    def export(self, interaction_id: Optional[str] = None) -> Any:
+        """Waterfall(s) as JSON-ready dicts, newest first.
+
+        Offsets are milliseconds from the first request of the interaction.
+        """
+        with self._lock:
+            if interaction_id is not None:
+                interaction = self._interactions.get(interaction_id)
+                return self._waterfall(interaction) if interaction else None
+            return [self._waterfall(i) for i in reversed(self._interactions.values())]
+
+    @staticmethod
+    def _waterfall(interaction: Dict[str, Any]) -> Dict[str, Any]:
+        origin = interaction['start']
+
+        def ms(value: Optional[float], base: float = origin) -> Optional[float]:
+            return None if value is None else round((value - base) * 1000, 2)
+
+        steps: List[Dict[str, Any]] = []
+        for step in interaction['steps']:
+            request_ms = ms(step['response_end'], step['request_start'])
+            compute_ms = (ms(step['callback_end'], step['callback_start'])
+                          if step.get('callback_start') is not None else None)
+            steps.append({
+                'callback': step['callback'] or ','.join(step['outputs']),
+                'trigger': step['trigger'],
+                'parent': step['parent'],
+                'start_ms': ms(step['request_start']),
+                'end_ms': ms(step['response_end']),
+                'gap_ms': (ms(step['request_start'], step['gap_start'])
+                           if step['gap_start'] is not None else None),
+                'request_ms': request_ms,
+                'compute_ms': compute_ms,
+                'overhead_ms': (round(request_ms - compute_ms, 2)
+                                if compute_ms is not None else None),
+            })
+
+        total_ms = max((s['end_ms'] for s in steps), default=0.0)
+        return {
+            'id': interaction['id'],
+            'started_at': interaction['started_at'],
+            'origin': interaction['origin'],
+            'total_ms': total_ms,
+            'compute_ms': round(sum(s['compute_ms'] or 0 for s in steps), 2),
+            'overhead_ms': round(sum(s['overhead_ms'] or 0 for s in steps), 2),
+            'gap_ms': round(sum(s['gap_ms'] or 0 for s in steps), 2),
+            'steps': steps
+        }
+
+    @classmethod
+    def _prop_ids(cls, outputs: Any) -> Iterator[str]:
+        """Flatten Dash output specs into 'id.property' strings."""
+        if isinstance(outputs, list):
+            for output in outputs:
+                yield from cls._prop_ids(output)
+        elif isinstance(outputs, dict) and 'id' in outputs:
+            component_id = outputs['id']
+            if isinstance(component_id, dict):
+                component_id = json.dumps(component_id, sort_keys=True,
+                                          separators=(',', ':'))
+            yield f"{component_id}.{outputs.get('property')}"
+
+
+interactions = InteractionTracker()
@@ -1,11 +1,14 @@
 import json
+import logging
 import os
 import re
 from typing import Dict, Tuple
 
 import pandas as pd
 
-from infrastructure.logger import logger, timer
+from infrastructure.logger import get_module_logger, timer
+
+logger = get_module_logger(__name__)
 
 
 @timer
@@ -53,7 +56,7 @@ def load_json(file_path: str) -> Dict:
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             data: Dict = json.load(f)
-        logger.debug(f"Successfully loaded {file_path}")
+        logger.debug("Successfully loaded %s", file_path)
         return data
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
@@ -104,10 +107,12 @@ def save_df_to_csv(df: pd.DataFrame, filename: str, AppConfig, max_rows: int = 1
 
     # Save file
     df_to_save_ordered.to_csv(full_path_ordered, index=False)
-    logger.debug(f"Saved {n_rows} ordered rows to {full_path_ordered}")
+    logger.debug("Saved %d ordered rows to %s", n_rows, full_path_ordered)
 
 
 def log_dataframe_info(df: pd.DataFrame, step_name: str) -> None:
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     logger.debug(f"--- {step_name} ---")
     logger.debug(f"DataFrame shape: {df.shape}")
     logger.debug(f"Columns: {df.columns.tolist()}")
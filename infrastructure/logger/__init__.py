@@ -1,6 +1,8 @@
 from .callback_decorators import configure_callback_logger, dash_callback
-from .logging_config import logger, setup_logging, timer, pipe_timer, pipe_with_logging
+from .logging_config import logger, get_module_logger, setup_logging, timer, pipe_timer, pipe_with_logging
+from .logging_config import configure_memory_accounting
 from .logging_config import AccessibleMemoryHandler as DashDebugHandler
 
 
-__all__ = ['configure_logger', 'dash_callback', 'setup_logging', 'logger', 'timer', 'DashDebugHandler', 'pipe_timer']
\ No newline at end of file
+__all__ = ['configure_logger', 'dash_callback', 'setup_logging', 'logger', 'get_module_logger', 'timer', 'DashDebugHandler', 'pipe_timer',
+           'configure_memory_accounting']
\ No newline at end of file
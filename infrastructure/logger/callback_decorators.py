@@ -12,6 +12,9 @@ from colorama import Fore, Style
 
 # Import from enhanced logging_config
 from .logging_config import get_logger, timer
+from infrastructure.metrics import metrics
+from infrastructure.profiling import profiler
+from infrastructure.interactions import interactions
 
 T = TypeVar('T')
 
@@ -87,6 +90,7 @@ def dash_callback(func: Callable[..., T]) -> Callable[..., T]:
                                             'value': None})
 
         start = time.time()
+        compute_start = time.perf_counter()
         # Always use the same logger instance via get_logger
         # This is critical for preventing duplication
         logger = get_logger('callbacks')
@@ -94,8 +98,8 @@ def dash_callback(func: Callable[..., T]) -> Callable[..., T]:
         logger.setLevel(CALLBACK)
 
         try:
-            # Execute the callback function
-            result = func(*args, **kwargs)
+            # Execute the callback function (profiled when requested)
+            result = profiler.run(func.__name__, func, *args, **kwargs)
 
             # Log successful execution
             time_ms = (time.time() - start) * 1000
@@ -107,6 +111,8 @@ def dash_callback(func: Callable[..., T]) -> Callable[..., T]:
                 extra={'is_callback': True})
 
             callback_tracker._add_execution(func.__name__, time_ms)
+            metrics.observe('app_callback_duration_seconds', time_ms / 1000,
+                            callback=func.__name__, status='ok')
 
             if time_ms > 1000:
                 logger.warning(f"Slow callback: {func.__name__} {time_ms:.2f}ms")
@@ -114,6 +120,9 @@ def dash_callback(func: Callable[..., T]) -> Callable[..., T]:
             return result
 
         except dash.exceptions.PreventUpdate:
+            metrics.observe('app_callback_duration_seconds',
+                            time.time() - start,
+                            callback=func.__name__, status='prevented')
             # Handle PreventUpdate separately (just log it)
             logger.log(
                 CALLBACK,
@@ -123,6 +132,9 @@ def dash_callback(func: Callable[..., T]) -> Callable[..., T]:
             raise
 
         except Exception as e:
+            metrics.observe('app_callback_duration_seconds',
+                            time.time() - start,
+                            callback=func.__name__, status='error')
             # Error handling part (from error_handler)
             logger.error(f"Error in {func.__name__}: {str(e)}", exc_info=True)
 
@@ -201,6 +213,8 @@ def dash_callback(func: Callable[..., T]) -> Callable[..., T]:
             return cast(T, f"Error in {func.__name__}: {str(e)}")
 
         finally:
+            interactions.mark_callback(
+                func.__name__, compute_start, time.perf_counter())
             # Restore the original log level
             logger.setLevel(orig_level)
 
@@ -1,17 +1,23 @@
 from __future__ import annotations
+import itertools
 import logging
 import os
+import re
+import sys
+import threading
 import time
-import inspect
+import tracemalloc
+from collections import Counter, defaultdict, deque
 from dataclasses import dataclass
 from functools import wraps
-from logging.handlers import RotatingFileHandler, MemoryHandler
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, TypeVar, cast, Protocol, List
-import psutil
+from typing import Any, Callable, DefaultDict, Deque, Dict, Iterator, Optional, TypeVar, cast, Protocol, List, Tuple
 from colorama import Fore, Style, init
 import functools
 
+from infrastructure.metrics import metrics
+
 init(autoreset=True)
 T = TypeVar('T')
 T_co = TypeVar('T_co', covariant=True)
@@ -20,6 +26,14 @@ T_co = TypeVar('T_co', covariant=True)
 MONITORING_ENABLED = True
 _timer_states: Dict[str, bool] = {}
 
+# Sampled memory accounting (see configure_memory_accounting)
+_memory_accounting = {'sample_every': 0, 'trace_peak': False}
+# One counter per step or timer, so every stage gets its share of samples
+_memory_samples: DefaultDict[str, Iterator[int]] = defaultdict(lambda: itertools.count(1))
+# tracemalloc is process-wide: traced steps run one at a time
+_trace_lock = threading.Lock()
+_trace_state = threading.local()
+
 # Logger cache to prevent duplicate logger instances
 _LOGGERS: Dict[str, logging.Logger] = {}
 
@@ -37,21 +51,107 @@ def get_logger(name: str) -> logging.Logger:
     return _LOGGERS[name]
 
 
-class AccessibleMemoryHandler(MemoryHandler):
-    """Extended MemoryHandler that provides access to its buffer"""
+@dataclass(frozen=True)
+class LogEntry:
+    seq: int
+    created: float
+    level: int
+    levelname: str
+    module: str
+    message: str
+
+    def format(self) -> str:
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.created))
+        millis = int(self.created * 1000) % 1000
+        return (f"{timestamp},{millis:03d} - {self.module} - "
+                f"{self.levelname} - {self.message}")
+
+
+class AccessibleMemoryHandler(logging.Handler):
+    """Ring buffer of structured log records for the debug panel.
+
+    Records get increasing sequence ids, so readers can fetch only what is
+    new since their last poll. The buffer keeps per-module and per-level
+    counts of the records it holds, so filter options need no rescan.
+    """
+
+    _ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
 
     def __init__(self, max_entries: int = 1000):
-        # Initialize without a target handler (we'll use this as a permanent store)
-        super().__init__(capacity=max_entries, target=None)
-        self.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        self.setLevel(logging.DEBUG)
+        super().__init__(level=logging.DEBUG)
+        self.max_entries = max_entries
+        self.buffer: Deque[LogEntry] = deque(maxlen=max_entries)
+        self.module_counts: Counter = Counter()
+        self.level_counts: Counter = Counter()
+        self._seq = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    @property
+    def modules(self) -> List[str]:
+        """Modules with records in the buffer, sorted."""
+        with self.lock:
+            return sorted(self.module_counts)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = self._ANSI_ESCAPE.sub('', record.getMessage())
+            if record.exc_info and record.exc_info[0] is not None:
+                message = f"{message}\n{logging.Formatter().formatException(record.exc_info)}"
+        except Exception:
+            self.handleError(record)
+            return
+
+        # emit() runs under the handler lock
+        if len(self.buffer) == self.max_entries:
+            evicted = self.buffer[0]
+            self._forget(self.module_counts, evicted.module)
+            self._forget(self.level_counts, evicted.level)
+        self._seq += 1
+        self.buffer.append(LogEntry(
+            seq=self._seq, created=record.created, level=record.levelno,
+            levelname=record.levelname, module=record.name, message=message))
+        self.module_counts[record.name] += 1
+        self.level_counts[record.levelno] += 1
+
+    def records_since(
+        self,
+        seq: int = 0,
+        min_level: int = logging.NOTSET,
+        modules: Optional[List[str]] = None
+    ) -> Tuple[List[LogEntry], int]:
+        """Records after seq matching the filters, and the latest seq id.
+
+        Walks back from the newest record, so the cost is proportional to
+        the number of records added since seq.
+        """
+        module_set = set(modules) if modules else None
+        with self.lock:
+            last_seq = self._seq
+            new = []
+            for entry in reversed(self.buffer):
+                if entry.seq <= seq:
+                    break
+                new.append(entry)
+        new.reverse()
+        return [entry for entry in new
+                if entry.level >= min_level
+                and (module_set is None or entry.module in module_set)], last_seq
 
     @property
     def log_entries(self) -> List[str]:
         """Get formatted log entries from the buffer"""
-        if not self.formatter:
-            return [str(record.msg) for record in self.buffer]
-        return [self.formatter.format(record) for record in self.buffer]
+        with self.lock:
+            entries = list(self.buffer)
+        return [entry.format() for entry in entries]
+
+    @staticmethod
+    def _forget(counts: Counter, key: Any) -> None:
+        counts[key] -= 1
+        if counts[key] <= 0:
+            del counts[key]
 
 
 class ColoredFormatter(logging.Formatter):
@@ -105,35 +205,61 @@ class ColoredCallbackFormatter(ColoredFormatter):
 
 
 
+def _level_method(level: int, **defaults: Any) -> Callable[..., None]:
+    def log_method(self: 'ModuleLogger', msg: Any, *args: Any, **kwargs: Any) -> None:
+        module_logger = self._logger()
+        if module_logger.isEnabledFor(level):
+            for key, value in defaults.items():
+                kwargs.setdefault(key, value)
+            kwargs.setdefault('stacklevel', 2)
+            module_logger.log(level, msg, *args, **kwargs)
+    return log_method
+
+
 class ModuleLogger:
-    def _get_caller_module(self) -> str:
-        frame = inspect.currentframe()
-        if not frame:
-            return "unknown"
-
-        logger_module = inspect.getmodule(frame)
-        logger_name = logger_module.__name__ if logger_module else "unknown"
-
-        while frame := frame.f_back:
-            if module := inspect.getmodule(frame):
-                if module.__name__ != logger_name:
-                    return module.__name__
-        return "unknown"
-
-    def __getattr__(self, name: str) -> Callable:
-        if name in ('debug', 'info', 'warning', 'error', 'critical', 'exception'):
-            def log_method(msg: str, *args, **kwargs) -> None:
-                # Use get_logger instead of logging.getLogger
-                logger = get_logger(self._get_caller_module())
-                getattr(logger, name)(msg, *args, **kwargs)
-            return log_method
-        elif name == 'log':
-            def log_method(level: int, msg: str, *args, **kwargs) -> None:
-                # Use get_logger instead of logging.getLogger
-                logger = get_logger(self._get_caller_module())
-                logger.log(level, msg, *args, **kwargs)
-            return log_method
-        raise AttributeError(f"'ModuleLogger' object has no attribute '{name}'")
+    """Logs under the name of the calling module.
+
+    An unbound instance reads the caller's module name from its frame
+    globals; bind(__name__) resolves it once at import time. Loggers are
+    cached per name and the level is checked before anything else, so a
+    filtered-out call costs a lookup and isEnabledFor. Pass %-style
+    arguments (logger.debug("rows %d", n)) to defer formatting as well.
+    """
+    __slots__ = ('_name',)
+
+    def __init__(self, name: Optional[str] = None):
+        self._name = name
+
+    def bind(self, name: str) -> 'ModuleLogger':
+        """Return a logger fixed to the given module name."""
+        return ModuleLogger(name)
+
+    def _logger(self) -> logging.Logger:
+        # Frames: 0 = _logger, 1 = logging method, 2 = caller
+        name = self._name or sys._getframe(2).f_globals.get('__name__', 'unknown')
+        module_logger = _LOGGERS.get(name)
+        return module_logger if module_logger is not None else get_logger(name)
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self._logger().isEnabledFor(level)
+
+    debug = _level_method(logging.DEBUG)
+    info = _level_method(logging.INFO)
+    warning = _level_method(logging.WARNING)
+    error = _level_method(logging.ERROR)
+    critical = _level_method(logging.CRITICAL)
+    exception = _level_method(logging.ERROR, exc_info=True)
+
+    def log(self, level: int, msg: Any, *args: Any, **kwargs: Any) -> None:
+        module_logger = self._logger()
+        if module_logger.isEnabledFor(level):
+            kwargs.setdefault('stacklevel', 2)
+            module_logger.log(level, msg, *args, **kwargs)
+
+
+def get_module_logger(name: str) -> ModuleLogger:
+    """Module-level logger resolved once, for use as logger = get_module_logger(__name__)."""
+    return ModuleLogger(name)
 
 
 # Use get_logger to create module logger
@@ -217,6 +343,7 @@ class MemoryStats:
 
     @classmethod
     def capture(cls) -> 'MemoryStats':
+        import psutil  # Deferred: only sampled runs read process memory
         process = psutil.Process(os.getpid())
         mem = process.memory_info()
         return cls(
@@ -227,6 +354,57 @@ class MemoryStats:
         )
 
 
+def configure_memory_accounting(sample_every: int = 0, trace_peak: bool = False) -> None:
+    """Account memory on one of every sample_every runs of each step or
+    timed function (0 disables).
+
+    Sampled pipeline steps record the deep memory usage of their input and
+    output frames, sampled timers the RSS change; with trace_peak the
+    tracemalloc peak of the step is recorded as well. tracemalloc is only
+    running during sampled runs; traced steps of concurrent requests wait
+    for each other, and a peak still includes allocations made by other
+    threads at the same time.
+    """
+    _memory_accounting.update(sample_every=sample_every, trace_peak=trace_peak)
+
+
+def _sample_memory(key: str) -> bool:
+    sample_every = _memory_accounting['sample_every']
+    return bool(sample_every) and next(_memory_samples[key]) % sample_every == 0
+
+
+def _frame_bytes(obj: Any) -> Optional[int]:
+    """Deep memory usage of a DataFrame or Series, None for other objects."""
+    memory_usage = getattr(obj, 'memory_usage', None)
+    if memory_usage is None:
+        return None
+    usage = memory_usage(deep=True)
+    return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+
+
+def _run_traced(func: Callable[..., T], *args: Any, **kwargs: Any) -> tuple:
+    """Run func and return its result with the tracemalloc peak in bytes.
+
+    The peak is None for a step traced inside another traced step, whose
+    peak it would otherwise reset.
+    """
+    if getattr(_trace_state, 'active', False):
+        return func(*args, **kwargs), None
+    with _trace_lock:
+        _trace_state.active = True
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            result = func(*args, **kwargs)
+            return result, tracemalloc.get_traced_memory()[1]
+        finally:
+            if started:
+                tracemalloc.stop()
+            _trace_state.active = False
+
+
 def timer(func: Optional[Callable] = None, *, monitor_memory: bool = True, enabled: bool = True):
     def decorator(func: Callable[..., T]) -> TimerWrapper[T_co]:
         timer_key = f"timer_{func.__name__}"
@@ -237,27 +415,21 @@ def timer(func: Optional[Callable] = None, *, monitor_memory: bool = True, enabl
             if not _timer_states[timer_key] or not MONITORING_ENABLED:
                 return func(*args, **kwargs)
 
-            start_time = time.time()
-            start_mem = MemoryStats.capture() if monitor_memory else None
+            sampled = monitor_memory and _sample_memory(timer_key)
+            start_time = time.perf_counter()
+            start_mem = MemoryStats.capture() if sampled else None
             result = func(*args, **kwargs)
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
 
-            if monitor_memory and start_mem:
+            metrics.observe('app_function_duration_seconds', duration,
+                            function=func.__name__)
+            if start_mem is not None:
                 end_mem = MemoryStats.capture()
-                delta_rss = end_mem.rss - start_mem.rss
-                print(
-                    f"{Fore.LIGHTBLACK_EX}{func.__name__}: "
-                    f"RSS={end_mem.rss:.1f}MB (Δ{delta_rss:+.1f}MB) | "
-                    f"Process: {end_mem.percent:.1f}% | "
-                    f"System: {end_mem.system_used:.1f}% | "
-                    f"Time: {duration*1000:.2f}ms{Style.RESET_ALL}"
-                )
-                if delta_rss > start_mem.rss * 0.5:
-                    print(f"{Fore.YELLOW}High memory increase in {func.__name__}: "
-                          f"RSS: +{(delta_rss/start_mem.rss)*100:.0f}% | "
-                          f"VMS: {end_mem.vms:.1f}MB{Style.RESET_ALL}")
-            else:
-                print(f"{Fore.LIGHTBLACK_EX}{func.__name__}: Time: {duration*1000:.2f}ms{Style.RESET_ALL}")
+                metrics.set_gauge('app_function_rss_delta_bytes',
+                                  (end_mem.rss - start_mem.rss) * 1024 * 1024,
+                                  function=func.__name__)
+                metrics.set_gauge('app_process_rss_bytes',
+                                  end_mem.rss * 1024 * 1024)
 
             return result
 
@@ -269,47 +441,43 @@ def timer(func: Optional[Callable] = None, *, monitor_memory: bool = True, enabl
 
 
 def pipe_timer(name=None):
-    """Custom timer decorator that preserves the specified name or uses original function name"""
+    """Decorator recording each call as a pipeline step, like pipe_with_logging.
+
+    The step is named name, or the function name; its first argument is
+    taken as the input frame.
+    """
     def decorator(func):
+        step_name = name or getattr(func, '__name__', 'unnamed_step')
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Use provided name or get function name
-            display_name = name or getattr(func, '__name__', 'unnamed_step')
-
-            # Capture start metrics
-            start_time = time.time()
-            start_mem = MemoryStats.capture()
-
-            # Execute the function
-            result = func(*args, **kwargs)
-
-            # Calculate metrics
-            duration = time.time() - start_time
-            end_mem = MemoryStats.capture()
-            delta_rss = end_mem.rss - start_mem.rss
-
-            # Print performance info with the actual name
-            print(
-                f"{Fore.LIGHTBLACK_EX}{display_name}: "
-                f"RSS={end_mem.rss:.1f}MB (Δ{delta_rss:+.1f}MB) | "
-                f"Process: {end_mem.percent:.1f}% | "
-                f"System: {end_mem.system_used:.1f}% | "
-                f"Time: {duration*1000:.2f}ms{Style.RESET_ALL}"
-            )
-
-            return result
+            return _run_step(step_name, args[0] if args else None,
+                             lambda: func(*args, **kwargs))
         return wrapper
     return decorator
 
 def pipe_with_logging(df, func, *args, **kwargs):
-    step_name = getattr(func, '__name__', 'unnamed_step')
-
-    # Use the custom pipe_timer with the original function name
-    @pipe_timer(name=step_name)
-    def timed_func(dataframe):
-        return func(dataframe, *args, **kwargs)
-
-    # Execute the timed function
-    result = timed_func(df)
-
-    return result
\ No newline at end of file
+    """Run one pipeline step, recording its timing and rows in metrics."""
+    return _run_step(getattr(func, '__name__', 'unnamed_step'), df,
+                     lambda: func(df, *args, **kwargs))
+
+
+def _run_step(step_name: str, df: Any, call: Callable[[], Any]) -> Any:
+    """Run call as the step step_name on input df, recording it in metrics."""
+    # Memory is only accounted on sampled runs and goes to metrics
+    sampled = _sample_memory(step_name)
+    peak = None
+    start_time = time.perf_counter()
+    if sampled and _memory_accounting['trace_peak']:
+        result, peak = _run_traced(call)
+    else:
+        result = call()
+    metrics.record_stage(
+        step_name, time.perf_counter() - start_time,
+        rows_in=len(df) if hasattr(df, '__len__') else None,
+        rows_out=len(result) if hasattr(result, '__len__') else None)
+    if sampled:
+        metrics.record_stage_memory(
+            step_name, _frame_bytes(df), _frame_bytes(result), peak)
+
+    return result
@@ -0,0 +1,205 @@
+# infrastructure/metrics.py
+import bisect
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, Response, abort, request
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Seconds; spans fast pipeline steps up to slow full renders
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-process counters, gauges and latency histograms in Prometheus format.
+
+    Histograms are cumulative per label set, so p50/p95/p99 can be derived
+    with histogram_quantile() on the scraping side. Cache lookups are
+    counted as hits and misses, and their ratio is exported as a gauge.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = defaultdict(dict)
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(
+            lambda: defaultdict(float))
+        self._gauges: Dict[str, Dict[LabelKey, float]] = defaultdict(dict)
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        """Set the TYPE and HELP lines of a metric."""
+        self._help[name] = (kind, help_text)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Add a value to a histogram."""
+        key = self._label_key(labels)
+        with self._lock:
+            histogram = self._histograms[name].get(key)
+            if histogram is None:
+                histogram = self._histograms[name][key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Increase a counter."""
+        key = self._label_key(labels)
+        with self._lock:
+            self._counters[name][key] += value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge to its latest value."""
+        key = self._label_key(labels)
+        with self._lock:
+            self._gauges[name][key] = value
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Count one lookup of a named cache."""
+        self.inc('app_cache_hits_total' if hit else 'app_cache_misses_total',
+                 cache=cache)
+
+    def record_stage(self, stage: str, seconds: float,
+                     rows_in: Optional[int] = None,
+                     rows_out: Optional[int] = None) -> None:
+        """Record duration and row counts of one pipeline step."""
+        self.observe('app_pipeline_stage_duration_seconds', seconds, stage=stage)
+        if rows_in is not None:
+            self.inc('app_pipeline_stage_rows_in_total', rows_in, stage=stage)
+        if rows_out is not None:
+            self.inc('app_pipeline_stage_rows_out_total', rows_out, stage=stage)
+
+    def record_stage_memory(self, stage: str, bytes_in: Optional[int],
+                            bytes_out: Optional[int],
+                            peak: Optional[int] = None) -> None:
+        """Record sampled frame sizes and allocation peak of a pipeline step."""
+        for side, value in (('in', bytes_in), ('out', bytes_out)):
+            if value is not None:
+                self.set_gauge('app_pipeline_stage_frame_bytes', value,
+                               stage=stage, side=side)
+        if peak is not None:
+            self.set_gauge('app_pipeline_stage_peak_bytes', peak, stage=stage)
+
+    def render(self) -> str:
+        """Current values in Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, 'histogram')
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(
+                            histogram.buckets + (math.inf,), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == math.inf else repr(bound)
+                        lines.append(f"{name}_bucket"
+                                     f"{self._labels(key + (('le', le),))} "
+                                     f"{cumulative}")
+                    lines.append(f"{name}_sum{self._labels(key)} {histogram.sum!r}")
+                    lines.append(f"{name}_count{self._labels(key)} {histogram.count}")
+
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, 'counter')
+                for key, value in series.items():
+                    lines.append(f"{name}{self._labels(key)} {self._number(value)}")
+
+            for name, series in sorted(self._gauges.items()):
+                self._header(lines, name, 'gauge')
+                for key, value in series.items():
+                    lines.append(f"{name}{self._labels(key)} {self._number(value)}")
+
+            hits = self._counters.get('app_cache_hits_total', {})
+            misses = self._counters.get('app_cache_misses_total', {})
+            if hits or misses:
+                self._header(lines, 'app_cache_hit_ratio', 'gauge')
+                for key in sorted(set(hits) | set(misses)):
+                    total = hits.get(key, 0) + misses.get(key, 0)
+                    ratio = hits.get(key, 0) / total if total else 0.0
+                    lines.append(f"app_cache_hit_ratio{self._labels(key)} {ratio!r}")
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """Drop all recorded values."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def init_app(self, server: Flask, path: str = '/metrics',
+                 local_only: bool = True) -> None:
+        """Expose render() on the Flask server.
+
+        With local_only, requests from other hosts get a 404 so the
+        endpoint can stay enabled behind a public port.
+        """
+        def metrics_endpoint() -> Response:
+            if local_only and request.remote_addr not in ('127.0.0.1', '::1'):
+                abort(404)
+            return Response(self.render(),
+                            mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+        server.add_url_rule(path, 'metrics', metrics_endpoint)
+
+    def _header(self, lines: List[str], name: str, default_kind: str) -> None:
+        kind, help_text = self._help.get(name, (default_kind, ''))
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    @staticmethod
+    def _label_key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    @staticmethod
+    def _labels(key: LabelKey) -> str:
+        if not key:
+            return ''
+        pairs = (
+            '{}="{}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"')
+                             .replace('\n', '\\n'))
+            for k, v in key)
+        return '{' + ','.join(pairs) + '}'
+
+    @staticmethod
+    def _number(value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+metrics = MetricsRegistry()
+metrics.describe('app_callback_duration_seconds', 'histogram',
+                 'Dash callback execution time')
+metrics.describe('app_pipeline_stage_duration_seconds', 'histogram',
+                 'Data pipeline step execution time')
+metrics.describe('app_pipeline_stage_rows_in_total', 'counter',
+                 'Rows entering a data pipeline step')
+metrics.describe('app_pipeline_stage_rows_out_total', 'counter',
+                 'Rows leaving a data pipeline step')
+metrics.describe('app_pipeline_stage_frame_bytes', 'gauge',
+                 'Deep memory usage of a step input/output frame (sampled)')
+metrics.describe('app_pipeline_stage_peak_bytes', 'gauge',
+                 'tracemalloc peak during a pipeline step (sampled)')
+metrics.describe('app_function_duration_seconds', 'histogram',
+                 'Execution time of @timer decorated functions')
+metrics.describe('app_function_rss_delta_bytes', 'gauge',
+                 'RSS change across a @timer decorated function (sampled)')
+metrics.describe('app_process_rss_bytes', 'gauge', 'Process RSS at the last sample')
+metrics.describe('app_cache_hits_total', 'counter', 'Cache lookups served from cache')
+metrics.describe('app_cache_misses_total', 'counter', 'Cache lookups that missed')
+metrics.describe('app_cache_hit_ratio', 'gauge', 'Hits over lookups per cache')
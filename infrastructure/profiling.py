@@ -0,0 +1,281 @@
+# infrastructure/profiling.py
+import cProfile
+import functools
+import io
+import itertools
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from flask import Flask, Response, abort, has_request_context, jsonify, request
+
+
+@dataclass
+class ProfileRecord:
+    id: int
+    callback: str
+    timestamp: float
+    duration_ms: float
+    mode: str
+    data: bytes
+
+    @property
+    def filename(self) -> str:
+        extension = 'prof' if self.mode == 'cprofile' else 'collapsed'
+        return f"{self.callback}-{self.id}.{extension}"
+
+
+class _LoadedStats:
+    """Stored cProfile stats in the shape pstats.Stats loads from."""
+
+    def __init__(self, stats: Dict[Any, Any]):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stacks of a set of threads at a fixed interval into
+    collapsed stacks, each rooted at the label of its thread."""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True, name='callback-profiler')
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._threads: Dict[int, str] = {}
+        self._threads_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def add_thread(self, thread_id: int, label: str) -> None:
+        with self._threads_lock:
+            self._threads[thread_id] = label
+
+    def remove_thread(self, thread_id: int) -> None:
+        with self._threads_lock:
+            self._threads.pop(thread_id, None)
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            with self._threads_lock:
+                threads = list(self._threads.items())
+            frames = sys._current_frames()
+            for thread_id, label in threads:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}:"
+                                 f"{frame.f_code.co_name}")
+                    frame = frame.f_back
+                if stack:
+                    stack.append(label)
+                    self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self) -> bytes:
+        self._stop_event.set()
+        self.join()
+        return ''.join(f"{stack} {count}\n"
+                       for stack, count in self.stacks.items()).encode()
+
+
+class _ProfileSession:
+    """Profile of one callback request, shared with the pool tasks it runs."""
+
+    def __init__(self, mode: str, interval: float):
+        self.mode = mode
+        self.sampler = _StackSampler(interval) if mode == 'sample' else None
+        self._task_stats: List[Dict[Any, Any]] = []
+        self._lock = threading.Lock()
+
+    def run_task(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a task of this request on the current (pool) thread."""
+        if self.sampler is not None:
+            thread_id = threading.get_ident()
+            self.sampler.add_thread(thread_id, threading.current_thread().name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.sampler.remove_thread(thread_id)
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            profiler.create_stats()
+            with self._lock:
+                self._task_stats.append(profiler.stats)
+
+    def merge_stats(self, stats: Dict[Any, Any]) -> bytes:
+        """The callback thread's cProfile stats plus those of its tasks."""
+        merged = pstats.Stats(_LoadedStats(stats))
+        with self._lock:
+            for task_stats in self._task_stats:
+                merged.add(_LoadedStats(task_stats))
+        return marshal.dumps(merged.stats)
+
+
+# Profile session of the callback request running in the current context
+_active_session: ContextVar[Optional[_ProfileSession]] = ContextVar(
+    'profile_session', default=None)
+
+
+class CallbackProfiler:
+    """Opt-in profiling of Dash callbacks.
+
+    A callback request is profiled when it carries the trigger header, when
+    the page it comes from was opened with the trigger query flag
+    (?profile=1, read from the Referer), or as one of every sample_every
+    requests. With local_only, the header and query flag are only honoured
+    on requests from localhost, like the download routes. Profiles cover
+    the callback thread and the tasks it hands to thread pools through
+    wrap(), and are kept in memory for download from a local admin route:
+    collapsed stacks (rooted at the thread name) for flamegraph tools in
+    'sample' mode, pstats dumps in 'cprofile' mode.
+    """
+
+    HEADER = 'X-Profile-Callback'
+    QUERY_FLAG = 'profile'
+
+    def __init__(self, enabled: bool = False, mode: str = 'sample',
+                 sample_every: int = 0, interval: float = 0.005,
+                 max_profiles: int = 20, local_only: bool = True):
+        self.enabled = enabled
+        self.mode = mode
+        self.sample_every = sample_every
+        self.interval = interval
+        self.local_only = local_only
+        self._profiles: Deque[ProfileRecord] = deque(maxlen=max_profiles)
+        self._ids = itertools.count(1)
+        self._requests = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def configure(self, **settings: Any) -> None:
+        """Update settings; max_profiles resizes the stored history."""
+        max_profiles = settings.pop('max_profiles', None)
+        for name, value in settings.items():
+            setattr(self, name, value)
+        if max_profiles is not None:
+            with self._lock:
+                self._profiles = deque(self._profiles, maxlen=max_profiles)
+
+    def run(self, name: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Call func, profiling it if this request asks for it."""
+        if not self.enabled or not self._should_profile():
+            return func(*args, **kwargs)
+
+        session = _ProfileSession(self.mode, self.interval)
+        token = _active_session.set(session)
+        start = time.perf_counter()
+        if session.sampler is None:
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(func, *args, **kwargs)
+            finally:
+                profiler.create_stats()
+                _active_session.reset(token)
+                self._store(name, start, session.merge_stats(profiler.stats))
+
+        session.sampler.add_thread(threading.get_ident(), 'callback')
+        session.sampler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _active_session.reset(token)
+            self._store(name, start, session.sampler.stop())
+
+    def wrap(self, func: Callable) -> Callable:
+        """func, profiled into the current callback's profile wherever it runs.
+
+        Thread pools do not carry context over to their workers, so tasks
+        are wrapped when they are submitted. Outside a profiled callback
+        func is returned as is.
+        """
+        session = _active_session.get()
+        if session is None:
+            return func
+        return functools.partial(session.run_task, func)
+
+    def _should_profile(self) -> bool:
+        if has_request_context() and self._is_allowed():
+            if request.headers.get(self.HEADER):
+                return True
+            referrer = request.referrer
+            if referrer and parse_qs(urlparse(referrer).query).get(self.QUERY_FLAG):
+                return True
+        return bool(self.sample_every) and next(self._requests) % self.sample_every == 0
+
+    def _is_allowed(self) -> bool:
+        return not self.local_only or request.remote_addr in ('127.0.0.1', '::1')
+
+    def _store(self, name: str, start: float, data: bytes) -> None:
+        record = ProfileRecord(
+            id=next(self._ids),
+            callback=name,
+            timestamp=time.time(),
+            duration_ms=(time.perf_counter() - start) * 1000,
+            mode=self.mode,
+            data=data)
+        with self._lock:
+            self._profiles.append(record)
+
+    def get(self, profile_id: int) -> Optional[ProfileRecord]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def summary(self) -> list:
+        with self._lock:
+            return [{'id': p.id, 'callback': p.callback,
+                     'timestamp': p.timestamp,
+                     'duration_ms': round(p.duration_ms, 2),
+                     'mode': p.mode, 'file': p.filename}
+                    for p in reversed(self._profiles)]
+
+    @staticmethod
+    def format_stats(record: ProfileRecord, limit: int = 40) -> str:
+        """Text report of a cProfile record sorted by cumulative time."""
+        out = io.StringIO()
+        stats = pstats.Stats(_LoadedStats(marshal.loads(record.data)), stream=out)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def init_app(self, server: Flask, path: str = '/admin/profiles',
+                 local_only: bool = True) -> None:
+        """Register listing and download routes on the Flask server.
+
+        local_only also limits the header and query flag triggers.
+        """
+        self.local_only = local_only
+
+        def check_access() -> None:
+            if not self._is_allowed():
+                abort(404)
+
+        def list_profiles() -> Response:
+            check_access()
+            return jsonify(self.summary())
+
+        def download_profile(profile_id: int) -> Response:
+            check_access()
+            record = self.get(profile_id)
+            if record is None:
+                abort(404)
+            if record.mode == 'cprofile' and request.args.get('format') == 'text':
+                return Response(self.format_stats(record), mimetype='text/plain')
+            mimetype = ('application/octet-stream' if record.mode == 'cprofile'
+                        else 'text/plain')
+            return Response(record.data, mimetype=mimetype, headers={
+                'Content-Disposition': f'attachment; filename={record.filename}'})
+
+        server.add_url_rule(path, 'list_profiles', list_profiles)
+        server.add_url_rule(f"{path}/<int:profile_id>", 'download_profile',
+                            download_profile)
+
+
+profiler = CallbackProfiler()
@@ -0,0 +1,78 @@
+# infrastructure/replay.py
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List
+
+from flask import Flask, Response, g, request
+
+
+class CallbackRecorder:
+    """Appends Dash callback requests to a JSON lines file for replay.
+
+    Each line holds the browser session (told apart by a cookie), the
+    offset in seconds since that session's first callback, the callback
+    output spec and the request body exactly as the browser sent it, so
+    benchmarks.replay can resend whole sessions in their original order.
+    """
+
+    COOKIE = 'dash_replay_sid'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._session_start: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, server: Flask, url_base_pathname: str = '/') -> None:
+        """Record every POST to the callback endpoint of the server."""
+        update_path = f"{url_base_pathname.rstrip('/')}/_dash-update-component"
+
+        @server.before_request
+        def record_callback() -> None:
+            if request.path == update_path and request.method == 'POST':
+                self._record()
+
+        @server.after_request
+        def set_session_cookie(response: Response) -> Response:
+            session_id = getattr(g, 'replay_new_session', None)
+            if session_id:
+                response.set_cookie(self.COOKIE, session_id, httponly=True,
+                                    samesite='Lax')
+            return response
+
+    def _record(self) -> None:
+        payload = request.get_json(silent=True)
+        if payload is None:
+            return
+        session_id = request.cookies.get(self.COOKIE)
+        if not session_id:
+            session_id = g.replay_new_session = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            start = self._session_start.setdefault(session_id, now)
+            line = json.dumps({
+                'session': session_id,
+                'offset': round(now - start, 4),
+                'callback': payload.get('output'),
+                'payload': payload
+            }, ensure_ascii=False, separators=(',', ':'))
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    """Recorded sessions in file order: [{'session', 'requests': [...]}]."""
+    sessions: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in _read_lines(path):
+        sessions.setdefault(entry['session'], []).append(entry)
+    return [{'session': session_id, 'requests': entries}
+            for session_id, entries in sessions.items()]
+
+
+def _read_lines(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -0,0 +1,55 @@
+# infrastructure/startup.py
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class StartupTimer:
+    """Wall time of the consecutive phases of application startup.
+
+    mark(name) closes the phase that began at the previous mark, or at
+    start(), so each phase is the code between two marks. main.py reads
+    the clock before its imports and passes it to start() to include them.
+    """
+
+    def __init__(self):
+        self.start()
+
+    def start(self, at: Optional[float] = None) -> None:
+        """Begin timing at a perf_counter() value (now by default)."""
+        self.started = time.perf_counter() if at is None else at
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        """Close the current phase under name; returns its seconds."""
+        now = time.perf_counter()
+        seconds = now - self._last
+        self.phases.append((name, seconds))
+        self._last = now
+        return seconds
+
+    @property
+    def total(self) -> float:
+        return self._last - self.started
+
+    def export(self) -> Dict[str, float]:
+        """Phase seconds in startup order, plus the total."""
+        result = dict(self.phases)
+        result['total'] = self.total
+        return result
+
+    def summary(self, limit: Optional[int] = None) -> str:
+        """One line per phase, slowest first."""
+        phases = sorted(self.phases, key=lambda phase: phase[1], reverse=True)
+        lines = [f"Startup took {self.total * 1000:.0f}ms"]
+        for name, seconds in phases[:limit]:
+            share = seconds / self.total if self.total else 0.0
+            lines.append(f"  {name:<28}{seconds * 1000:>8.0f}ms {share:>5.0%}")
+        return '\n'.join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps(self.export())
+
+
+startup = StartupTimer()
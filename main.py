@@ -1,4 +1,6 @@
 # main.py
+import time
+STARTED = time.perf_counter()  # Before the imports below, to time them
 
 import os
 import warnings
@@ -10,6 +12,16 @@ from flask import Flask
 from presentation.app_layout import create_app_layout
 from application.bootstrap import initialize_application
 from presentation.callbacks_registry import CallbacksRegistry
+from infrastructure.compression import ResponseCompression
+from infrastructure.metrics import metrics
+from infrastructure.profiling import profiler
+from infrastructure.interactions import interactions
+from infrastructure.replay import CallbackRecorder
+from infrastructure.startup import startup
+from infrastructure.logger import logger
+
+startup.start(STARTED)
+startup.mark('imports')
 
 pd.options.mode.chained_assignment = None  # default='warn'
 warnings.filterwarnings('ignore', category=FutureWarning)
@@ -23,7 +35,6 @@ dbc._js_dist = [
     }
 ]
 
-print("Starting application initialization...")
 app = dash.Dash(
     __name__,
     url_base_pathname="/",
@@ -33,10 +44,6 @@ app = dash.Dash(
     update_title=None
 )
 app._favicon = None  # prevent favicon errors
-print("DBC version:", dbc.__version__)
-print("Dash version:", dash.__version__)
-print("Registered paths after init:", app.registered_paths)
-print("DBC paths:", dbc._js_dist)
 
 app.title = "Insurance Data Dashboard"
 app.index_string = '''
@@ -62,19 +69,62 @@ app.index_string = '''
 '''
 
 
+startup.mark('dash_app')
+
 services, config = initialize_application()
 storage_type = config.app_config.DEFAULT_STORAGE_TYPE
+logger.debug("Dash %s, DBC %s", dash.__version__, dbc.__version__)
 
 callbacks_registry = CallbacksRegistry(services, config)
 
 components, stores = callbacks_registry.create_all_components(storage_type)
 
 app.layout = create_app_layout(components, stores)
+startup.mark('layout')
 
 callbacks_registry.register_all_callbacks(app, components)
+startup.mark('callbacks')
 
 server: Flask = app.server
 
+if config.app_config.COMPRESSION_ENABLED:
+    ResponseCompression(
+        min_size=config.app_config.COMPRESSION_MIN_SIZE,
+        level=config.app_config.COMPRESSION_LEVEL,
+        cache_size=config.app_config.COMPRESSION_CACHE_SIZE
+    ).init_app(server, app.config.url_base_pathname)
+
+if config.app_config.METRICS_ENABLED:
+    metrics.init_app(server, config.app_config.METRICS_PATH,
+                     local_only=config.app_config.METRICS_LOCAL_ONLY)
+
+if config.app_config.PROFILER_ENABLED:
+    profiler.configure(
+        enabled=True,
+        mode=config.app_config.PROFILER_MODE,
+        sample_every=config.app_config.PROFILER_SAMPLE_EVERY,
+        interval=config.app_config.PROFILER_INTERVAL,
+        max_profiles=config.app_config.PROFILER_MAX_PROFILES
+    )
+    profiler.init_app(server, config.app_config.PROFILER_PATH,
+                      local_only=config.app_config.METRICS_LOCAL_ONLY)
+
+if config.app_config.INTERACTIONS_ENABLED:
+    interactions.max_interactions = config.app_config.INTERACTIONS_HISTORY
+    interactions.timeout = config.app_config.INTERACTIONS_TIMEOUT
+    interactions.max_sessions = config.app_config.INTERACTIONS_SESSIONS
+    interactions.init_app(server, app.config.url_base_pathname,
+                          config.app_config.INTERACTIONS_PATH,
+                          local_only=config.app_config.METRICS_LOCAL_ONLY)
+
+record_file = os.environ.get('CALLBACK_RECORD_FILE',
+                             config.app_config.CALLBACK_RECORD_FILE)
+if record_file:
+    CallbackRecorder(record_file).init_app(server, app.config.url_base_pathname)
+
+startup.mark('server_hooks')
+logger.info(startup.summary())
+
 
 def main() -> None:
     try:
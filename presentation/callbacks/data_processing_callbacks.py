@@ -1,11 +1,16 @@
 from typing import List
 import dash
 import pandas as pd
-from dash import Input, Output, State, html
+from dash import ALL, MATCH, ClientsideFunction, Input, Output, State, dcc, html
+from dash.exceptions import PreventUpdate
 from presentation.components import create_visual_section
+from presentation.render_state import SessionRenderState
 
 
 class DataProcessingCallbacks:
+    SECTION_SLOT = 'viz-section-slot'
+    SECTION_SLOT_LOADED = 'viz-section-slot loaded'
+
     def __init__(self,
                  data_processing_service):
         self.data_processing_service = data_processing_service
@@ -13,16 +18,41 @@ class DataProcessingCallbacks:
         self.logger = self.config.logger
         self.default_values = self.config.default_values
         self.dash_callback = self.config.dash_callback
+        self.client_views = self.config.app_config.CLIENT_VIEW_SWITCHING
+        self.eager_sections = self.config.app_config.EAGER_SECTIONS
+        self.render_state = SessionRenderState(
+            max_sessions=self.config.app_config.RENDER_STATE_SESSIONS,
+            max_ops=self.config.app_config.RENDER_STATE_MAX_OPS)
 
     def register_callbacks(self, app: dash.Dash) -> None:
+        # Per-page-load id used to keep the last rendered tree for Patch diffs
+        app.clientside_callback(
+            """
+            function(loaded, sessionId) {
+                if (sessionId) {
+                    return window.dash_clientside.no_update;
+                }
+                return Date.now().toString(36) + Math.random().toString(36).slice(2);
+            }
+            """,
+            Output('session-id', 'data'),
+            Input('_page-load', 'children'),
+            State('session-id', 'data')
+        )
+
+        # With client-side views all value types are computed up front,
+        # so toggling them no longer reprocesses data
+        processing_inputs = [Input('end-quarter', 'value'),
+                             Input('period-type', 'data'),
+                             Input('number-of-periods', 'data'),
+                             Input('selected-line-store', 'data'),
+                             Input('selected-metric-store', 'data')]
+        if not self.client_views:
+            processing_inputs.append(Input('view-metrics', 'data'))
+
         @app.callback(
             Output('process-data-one-trigger', 'data'),
-            [Input('end-quarter', 'value'),
-             Input('period-type', 'data'),
-             Input('number-of-periods', 'data'),
-             Input('selected-line-store', 'data'),
-             Input('selected-metric-store', 'data'),
-             Input('view-metrics', 'data')],
+            processing_inputs,
             [State('reporting-form', 'data')],
             prevent_initial_call=False
         )
@@ -43,38 +73,162 @@ class DataProcessingCallbacks:
             quarters = self.data_processing_service.prepare_visualization_data()
             return quarters
 
+        # Viewport changes only re-style existing figures in the browser
+        app.clientside_callback(
+            ClientsideFunction(namespace='clientside',
+                               function_name='relayoutCharts'),
+            Output('chart-relayout', 'data'),
+            Input('viewport-size', 'data'),
+            State('viewport-fonts', 'data'),
+            prevent_initial_call=True
+        )
+
+        # Sections past the eager ones are built when scrolled into view;
+        # clientside.js sets the trigger store of a visible placeholder
+        @app.callback(
+            Output({'type': 'viz-section', 'index': MATCH}, 'children'),
+            Output({'type': 'viz-section', 'index': MATCH}, 'className'),
+            Input({'type': 'viz-section-trigger', 'index': MATCH}, 'data'),
+            State('viewport-size', 'data'),
+            State('session-id', 'data'),
+            State('render-version', 'data'),
+            prevent_initial_call=True
+        )
+        @self.dash_callback
+        def render_visualization_section(trigger, viewport_size, session_id,
+                                         render_version):
+            """Build one lazily loaded visualization section."""
+            if not trigger:
+                raise PreventUpdate
+            index = dash.callback_context.triggered_id['index']
+            sections = self.data_processing_service.create_visualizations(
+                viewport_size=viewport_size, sections=[index])
+            if not sections:
+                raise PreventUpdate
+            children = create_visual_section(
+                table=sections[0]['table'], charts=sections[0]['charts'])
+            self.render_state.update(
+                session_id, render_version, ['props', 'children', index],
+                {'children': children, 'className': self.SECTION_SLOT_LOADED})
+            return children, self.SECTION_SLOT_LOADED
+
+        if self.client_views:
+            self._register_client_view_callbacks(app)
+            return
+
         @app.callback(
             Output('tables-container', 'children'),
+            Output('render-version', 'data'),
             [Input('process-data-two-trigger', 'data'),
-             Input('view-mode', 'data'),
-             Input('viewport-size', 'data')],
+             Input('view-mode', 'data')],
+            [State('viewport-size', 'data'),
+             State('session-id', 'data'),
+             State('render-version', 'data')],
             prevent_initial_call=True
         )
         @self.dash_callback
         def render_visualization_components(
             data_trigger,
             view_mode,
-            viewport_size
+            viewport_size,
+            session_id,
+            render_version
         ):
             """Master callback for rendering visualization components."""
-            try:
+            return self.render_state.render(
+                session_id, render_version, self._render_sections(viewport_size))
+
+    def _render_sections(self, viewport_size):
+        """Build visual sections for the current result frames.
 
-                visualization_sections = self.data_processing_service.create_visualizations(
-                    viewport_size=viewport_size,
+        Only the first eager_sections are built; the others are rendered as
+        placeholders and loaded by render_visualization_section on scroll.
+        """
+        try:
+            section_count = self.data_processing_service.get_section_count()
+            eager = list(range(min(self.eager_sections, section_count)))
+            visualization_sections = self.data_processing_service.create_visualizations(
+                viewport_size=viewport_size,
+                sections=eager
+            )
+            if not section_count or len(visualization_sections) < len(eager):
+                return create_visual_section()
+
+            # Create visual sections from data
+            sections = []
+            for i, section_data in enumerate(visualization_sections):
+                visual_section = create_visual_section(
+                    table=section_data['table'],
+                    charts=section_data['charts']
                 )
-                if not visualization_sections:
-                    return create_visual_section()
-
-                # Create visual sections from data
-                sections = []
-                for section_data in visualization_sections:
-                    visual_section = create_visual_section(
-                        table=section_data['table'],
-                        charts=section_data['charts']
-                    )
-                    sections.append(visual_section)
-                return html.Div(sections, className="visualization-grid")
+                sections.append(self._create_section_slot(i, visual_section))
+            for i in range(len(eager), section_count):
+                sections.append(self._create_section_slot(i))
+            return html.Div(sections, className="visualization-grid")
+
+        except Exception as e:
+            self.logger.error(f"Error rendering visualization: {str(e)}")
+            return create_visual_section()
+
+    def _create_section_slot(self, index: int,
+                             visual_section: html.Div = None) -> html.Div:
+        """Wrap a section, or a placeholder for it, in an addressable slot."""
+        if visual_section is not None:
+            return html.Div(visual_section,
+                            id={'type': 'viz-section', 'index': index},
+                            className=self.SECTION_SLOT_LOADED,
+                            **{'data-index': index})
+        return html.Div(
+            [html.Div(className='viz-section-placeholder'),
+             dcc.Store(id={'type': 'viz-section-trigger', 'index': index})],
+            id={'type': 'viz-section', 'index': index},
+            className=self.SECTION_SLOT,
+            **{'data-index': index})
+
+    def _register_client_view_callbacks(self, app: dash.Dash) -> None:
+        """Render sections once per data change and switch views in the browser.
 
+        View mode and value-type changes are handled by clientside callbacks
+        in assets/styles/clientside.js without a server round trip.
+        """
+        @app.callback(
+            Output('tables-container', 'children'),
+            Output('visualization-payload', 'data'),
+            Output('render-version', 'data'),
+            Input('process-data-two-trigger', 'data'),
+            State('viewport-size', 'data'),
+            State('session-id', 'data'),
+            State('render-version', 'data'),
+            prevent_initial_call=True
+        )
+        @self.dash_callback
+        def render_visualization_components(data_trigger, viewport_size,
+                                            session_id, render_version):
+            """Master callback for rendering visualization components."""
+            children, version = self.render_state.render(
+                session_id, render_version, self._render_sections(viewport_size))
+            try:
+                payload = self.data_processing_service.create_client_payload()
             except Exception as e:
-                self.logger.error(f"Error rendering visualization: {str(e)}")
-                return create_visual_section()
\ No newline at end of file
+                self.logger.error(f"Error building client payload: {str(e)}")
+                payload = dash.no_update
+            return children, payload, version
+
+        app.clientside_callback(
+            ClientsideFunction(namespace='clientside',
+                               function_name='updateVisualizationView'),
+            Output('visualization-root', 'className'),
+            Input('view-mode', 'data'),
+            Input('view-metrics', 'data'),
+            Input('visualization-payload', 'data')
+        )
+
+        app.clientside_callback(
+            ClientsideFunction(namespace='clientside',
+                               function_name='updateHiddenColumns'),
+            Output({'type': 'dynamic-table', 'index': ALL}, 'hidden_columns'),
+            Input('view-metrics', 'data'),
+            Input('visualization-payload', 'data'),
+            State({'type': 'dynamic-table', 'index': ALL}, 'columns'),
+            prevent_initial_call=True
+        )
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import Dict, List, Any, Union, Optional
 import dash
-from dash import Input, Output, ALL, html, dcc, ClientsideFunction, State, MATCH
+import logging
+from dash import Input, Output, ALL, html, ClientsideFunction, State, MATCH, Patch, no_update
 from dash.exceptions import PreventUpdate
 from presentation.style_constants import StyleConstants
 
@@ -75,46 +76,67 @@ class LayoutCallbacks:
         # Callback for updating module filter options
         @app.callback(
             Output('module-filter', 'options'),
-            Input('refresh-interval', 'n_intervals')
+            Input('refresh-interval', 'n_intervals'),
+            Input('debug-collapse', 'is_open'),
+            State('module-filter', 'options')
         )
-        def update_module_options_callback(n_intervals: Optional[int]) -> List[Dict[str, str]]:
-            modules = {log.split(' - ')[1] for log in self.memory_handler.log_entries
-                      if len(log.split(' - ')) >= 2}
-            return [{'label': module, 'value': module} for module in sorted(modules)]
+        def update_module_options_callback(
+            n_intervals: Optional[int],
+            is_open: bool,
+            current_options: Optional[List[Dict[str, str]]]
+        ) -> List[Dict[str, str]]:
+            if not is_open:
+                return no_update
+            options = [{'label': module, 'value': module}
+                       for module in self.memory_handler.modules]
+            return no_update if options == current_options else options
 
-        # Callback for updating debug logs based on filters
+        # Callback for updating debug logs based on filters. Interval ticks
+        # append records newer than the cursor; opening the panel or
+        # changing filters reloads the buffer
         @app.callback(
             Output('debug-logs', 'children'),
+            Output('debug-log-cursor', 'data'),
             Input('refresh-interval', 'n_intervals'),
+            Input('debug-collapse', 'is_open'),
             Input('log-level-filter', 'value'),
-            Input('module-filter', 'value')
+            Input('module-filter', 'value'),
+            State('debug-log-cursor', 'data')
         )
         def update_debug_logs_callback(
             n_intervals: Optional[int],
+            is_open: bool,
             level_filters: Optional[List[str]],
-            module_filters: Optional[List[str]]
-        ) -> str:
-            log_levels = {'CRITICAL': 50, 'ERROR': 40, 'WARNING': 30, 'INFO': 20, 'DEBUG': 10}
+            module_filters: Optional[List[str]],
+            cursor: Optional[Dict[str, int]]
+        ):
+            if not is_open:
+                return no_update, no_update
 
             # If no levels selected, show all
-            if not level_filters:
-                level_filters = list(log_levels.keys())
+            min_level = min((logging.getLevelName(level) for level in level_filters or []),
+                            default=logging.NOTSET)
 
-            min_level = min([log_levels[level] for level in level_filters], default=0)
+            incremental = dash.callback_context.triggered_id == 'refresh-interval' and cursor
+            since = cursor['seq'] if incremental else 0
+            records, last_seq = self.memory_handler.records_since(
+                since, min_level, module_filters)
+            lines = [f"{record.format()}\n" for record in records]
 
-            filtered_logs = []
-            for log in self.memory_handler.log_entries:
-                parts = log.split(' - ')
-                if len(parts) >= 3:
-                    log_level = log_levels.get(parts[2].strip(), 0)
-                    log_module = parts[1].strip() if len(parts) > 1 else None
+            if incremental:
+                if not lines:
+                    return no_update, no_update
+                count = cursor['count'] + len(lines)
+                if count <= self.memory_handler.max_entries:
+                    children = Patch()
+                    children.extend(lines)
+                    return children, {'seq': last_seq, 'count': count}
+                # Past the buffer size: resend what the buffer holds
+                records, last_seq = self.memory_handler.records_since(
+                    0, min_level, module_filters)
+                lines = [f"{record.format()}\n" for record in records]
 
-                    # Check if log matches filters
-                    if (log_level >= min_level and
-                        (not module_filters or log_module in module_filters)):
-                        filtered_logs.append(log)
-
-            return '\n'.join(filtered_logs)
+            return lines, {'seq': last_seq, 'count': len(lines)}
 
         # Callback for auto-scrolling logs
         app.clientside_callback(
@@ -135,18 +157,21 @@ class LayoutCallbacks:
             prevent_initial_call=True
         )
 
-        # Callback for toggling debug panel visibility
+        # Callback for toggling debug panel visibility; the log poll only
+        # runs while the panel is open
         @app.callback(
             Output("debug-collapse", "is_open"),
             Output("debug-collapse-button", "children"),
+            Output("refresh-interval", "disabled"),
             Input("debug-collapse-button", "n_clicks"),
             State("debug-collapse", "is_open"),
         )
         @self.dash_callback
-        def toggle_collapse(n_clicks: Optional[int], is_open: bool) -> tuple[bool, str]:
+        def toggle_collapse(n_clicks: Optional[int], is_open: bool) -> tuple[bool, str, bool]:
             if not n_clicks:
-                return False, "Show Logs"
-            return not is_open, "Hide Logs" if not is_open else "Show Logs"
+                return False, "Show Logs", True
+            return (not is_open, "Hide Logs" if not is_open else "Show Logs",
+                    is_open)
 
         @app.callback(
             Output('click-details', 'children'),
@@ -185,23 +210,15 @@ class LayoutCallbacks:
                         ], className="click-details")
             return ""
 
-        # 3. Add viewport detection components and clientside callback
-        app.layout.children.append(
-            html.Div([
-                dcc.Interval(id='viewport-check-interval',
-                             interval=1000, n_intervals=0)
-            ], style={'display': 'none'})
-        )
-
-        # Add clientside JavaScript for viewport detection
+        # Detect the viewport once on load; resizes are pushed from
+        # clientside.js with set_props after a debounce
         app.clientside_callback(
             ClientsideFunction(
                 namespace='clientside',
                 function_name='detectViewport'
             ),
             Output('viewport-size', 'data'),
-            Input('viewport-check-interval', 'n_intervals'),
-            prevent_initial_update=True
+            Input('_page-load', 'children')
         )
     
         # Create button and handle sidebar toggle
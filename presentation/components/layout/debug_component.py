@@ -42,7 +42,10 @@ class DebugComponent:
                             'padding': '5px', 'border': '1px solid #dee2e6', 'borderRadius': '4px',
                         }
                     ),
-                    dcc.Interval(id='refresh-interval', interval=1000, n_intervals=0),
+                    # Polls only while the panel is open (see LayoutCallbacks)
+                    dcc.Interval(id='refresh-interval', interval=1000,
+                                 n_intervals=0, disabled=True),
+                    dcc.Store(id='debug-log-cursor', data={'seq': 0, 'count': 0}),
                 ], className="px-0 pt-0"),
                 id="debug-collapse",
                 is_open=False
@@ -2,6 +2,7 @@
 from typing import Dict, List, Tuple, Any
 from dash.development.base_component import Component
 from dash import dcc, html
+from application.visualization import BarChartService
 from presentation.components import (
     DropdownComponent,
     ButtonComponent,
@@ -70,7 +71,13 @@ class Components:
                     storage_type=self.st
                 )
             ])        
-        stores.extend([dcc.Store(id='viewport-size', data='desktop')])
+        stores.extend([dcc.Store(id='viewport-size', data='desktop'),
+                       dcc.Store(id='viewport-fonts',
+                                 data=BarChartService.VIEWPORT_FONTS)])
+        stores.extend([dcc.Store(id='visualization-payload'),
+                       dcc.Store(id='chart-relayout'),
+                       dcc.Store(id='session-id'),
+                       dcc.Store(id='render-version')])
         return stores
 
     def create_button_components(self):
@@ -125,7 +132,12 @@ class Components:
         return debug_component.create_components(self.components)
 
     def create_visualization_components(self) -> tuple[Dict[str, Component], List]:
-        components = {'vizual_container': dcc.Loading(id="tables-container", type="default")}
+        # Static wrapper whose className switches views on the client
+        components = {'vizual_container': html.Div(
+            dcc.Loading(id="tables-container", type="default"),
+            id='visualization-root',
+            className='visualization-root'
+        )}
         return components
 
 
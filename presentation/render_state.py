@@ -0,0 +1,171 @@
+# presentation/render_state.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from dash import Patch, no_update
+from plotly.io.json import to_json_plotly
+
+PatchOp = Tuple[str, List[Any], Any]
+
+
+class SessionRenderState:
+    """Keeps recently rendered component trees per session and diffs against
+    the one the browser shows.
+
+    Every render returns a version (a hash of the serialized tree) that the
+    callback writes to a store in the same response as the tree. The Dash
+    renderer drops a superseded response as a whole, so the version the
+    browser sends back as State always names the tree it has applied. The
+    new tree is diffed against that tree: changed props become dash.Patch
+    operations, and a subtree with more than max_ops changes, or one whose
+    component type changed, is replaced as a whole. When the acknowledged
+    tree is unknown (new or evicted session) the full tree is sent.
+    """
+
+    def __init__(self, max_sessions: int = 32, max_ops: int = 50,
+                 max_versions: int = 4):
+        self.max_sessions = max_sessions
+        self.max_ops = max_ops
+        self.max_versions = max_versions
+        self._trees: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, session_id: Optional[str], version: Optional[str],
+               tree: Any) -> Tuple[Any, Any]:
+        """Return the output for tree and its version.
+
+        The output is a Patch against the tree of version when the browser
+        has it, the tree itself otherwise, and no_update when nothing
+        changed.
+        """
+        if not session_id or not self.max_sessions:
+            return tree, no_update
+
+        data = self._to_json(tree)
+        new_version = hashlib.sha1(data.encode('utf-8')).hexdigest()[:16]
+        if new_version == version:
+            return no_update, no_update
+        new = json.loads(data)
+
+        with self._lock:
+            versions = self._trees.get(session_id)
+            if versions is None:
+                versions = self._trees[session_id] = OrderedDict()
+            self._trees.move_to_end(session_id)
+            while len(self._trees) > self.max_sessions:
+                self._trees.popitem(last=False)
+            old = versions.get(version) if version else None
+            versions[new_version] = new
+            versions.move_to_end(new_version)
+            while len(versions) > self.max_versions:
+                versions.popitem(last=False)
+
+        if old is None:
+            return tree, new_version
+        ops = self._diff(old, new, [])
+        if not ops:
+            return no_update, new_version
+        if len(ops) == 1 and not ops[0][1]:
+            return tree, new_version
+        # Many ops with long locations can outweigh the tree itself
+        if len(json.dumps(ops)) >= len(data):
+            return tree, new_version
+        return self._to_patch(ops), new_version
+
+    def update(self, session_id: Optional[str], version: Optional[str],
+               path: List[Any], props: Dict[str, Any]) -> None:
+        """Record props set on a component of a rendered tree outside of
+        render().
+
+        Used when part of the tree is filled in by another callback (lazily
+        loaded sections), so the next diff starts from what the browser
+        shows. version is the tree the browser had when it sent the request;
+        unless it is the latest render of the session, the response may land
+        in another tree, so the session is dropped and the next render
+        resends the whole tree. The same happens if path does not resolve.
+        """
+        if not session_id:
+            return
+        new = json.loads(self._to_json(props))
+        with self._lock:
+            versions = self._trees.get(session_id)
+            if not versions:
+                return
+            if version is None or version != next(reversed(versions)):
+                self._trees.pop(session_id, None)
+                return
+            node = versions[version]
+            try:
+                for key in path:
+                    node = node[key]
+                node['props'].update(new)
+            except (KeyError, IndexError, TypeError):
+                self._trees.pop(session_id, None)
+
+    def clear(self, session_id: Optional[str] = None) -> None:
+        """Forget stored trees for one session or all sessions."""
+        with self._lock:
+            if session_id is None:
+                self._trees.clear()
+            else:
+                self._trees.pop(session_id, None)
+
+    @staticmethod
+    def _to_json(tree: Any) -> str:
+        """JSON form of a component tree, as Dash sends it."""
+        return to_json_plotly(tree)
+
+    def _diff(self, old: Any, new: Any, path: List[Any]) -> List[PatchOp]:
+        """Collect set/delete operations turning old into new."""
+        if old == new:
+            return []
+
+        if self._is_component(old) and self._is_component(new):
+            if (old.get('type'), old.get('namespace')) != (
+                    new.get('type'), new.get('namespace')):
+                return [('set', path, new)]
+            ops = self._diff_dict(old['props'], new['props'], path + ['props'])
+        elif isinstance(old, dict) and isinstance(new, dict):
+            ops = self._diff_dict(old, new, path)
+        elif (isinstance(old, list) and isinstance(new, list)
+              and len(old) == len(new)):
+            ops = []
+            for i, (old_item, new_item) in enumerate(zip(old, new)):
+                ops.extend(self._diff(old_item, new_item, path + [i]))
+        else:
+            return [('set', path, new)]
+
+        # Many small changes cost more than resending the subtree
+        if len(ops) > self.max_ops:
+            return [('set', path, new)]
+        return ops
+
+    def _diff_dict(self, old: dict, new: dict, path: List[Any]) -> List[PatchOp]:
+        ops = [('del', path + [key], None) for key in old if key not in new]
+        for key, value in new.items():
+            if key not in old:
+                ops.append(('set', path + [key], value))
+            else:
+                ops.extend(self._diff(old[key], value, path + [key]))
+        return ops
+
+    @staticmethod
+    def _is_component(value: Any) -> bool:
+        return (isinstance(value, dict) and 'props' in value
+                and 'type' in value and 'namespace' in value)
+
+    @staticmethod
+    def _to_patch(ops: List[PatchOp]) -> Patch:
+        patch = Patch()
+        for op, path, value in ops:
+            target = patch
+            for key in path[:-1]:
+                target = target[key]
+            if op == 'del':
+                del target[path[-1]]
+            else:
+                target[path[-1]] = value
+        return patch